@@ -5,14 +5,28 @@ import pymongo
 import certifi
 
 from streamlit_echarts import st_echarts
-import folium
-from streamlit_folium import st_folium, folium_static
-
-import requests
-from requests.structures import CaseInsensitiveDict
+import streamlit.components.v1 as components
 
 import os
+from concurrent.futures import ThreadPoolExecutor
 from mistralai import Mistral
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from pages.utils import bulk_loader, chart_options, market_metrics, rollups, snapshots
+from pages.utils.correlation import (
+    pairwise_correlations,
+    rolling_correlations,
+    lead_lag_correlations,
+    lead_lag_slice
+)
+from pages.utils.datasets import DATASETS, normalize
+from pages.utils.density_grid import density_grids
+from pages.utils.downsample import window_from_zoom
+from pages.utils.llm_orchestrator import Flight, LLMOrchestrator
+from pages.utils.property_map import render_map_html
+from pages.utils.resample import to_quarterly
+from pages.utils.timeparse import parse_dates
+from pages.utils.queries import hotel_indicator_pipeline
 
 
 # MongoDB connection setup
@@ -22,92 +36,276 @@ MONGO_URI = st.secrets["mongo"]["host"]
 GEOAPIFY = st.secrets["geoapify"]["key"]
 
 MISTRAL_API_KEY = st.secrets["mistral"]["key"]
+# Optional override, e.g. the local stand-in from scripts/mistral_stub.py
+MISTRAL_SERVER_URL = st.secrets["mistral"].get("server_url")
 MODEL = "mistral-large-latest"
-client = Mistral(api_key=MISTRAL_API_KEY)
+client = Mistral(api_key=MISTRAL_API_KEY, server_url=MISTRAL_SERVER_URL)
+
+# Upstream LLM limits shared by every session in this process
+MAX_LLM_CONCURRENCY = 4
+LLM_REQUESTS_PER_SECOND = 1.0
+LLM_BURST = 2
+LLM_TIMEOUT = 120
+
+# Concurrent fetches share the pooled client, so never run more than it holds
+MAX_POOL_SIZE = 5
 
 @st.cache_resource
 def init_connection():
-    return pymongo.MongoClient(MONGO_URI, tlsCAFile=ca, maxPoolSize=5)
+    return pymongo.MongoClient(MONGO_URI, tlsCAFile=ca, maxPoolSize=MAX_POOL_SIZE)
+
+# Columns each view reads, pushed down to MongoDB as projections
+HOTEL_COLUMNS = ("Time Period", "Hotel Indicator", "Value")
+EXCHANGE_COLUMNS = ("Date", "Close")
+
+# Point budgets for large chart series
+MAX_LINE_POINTS = 2000
+MAX_SCATTER_POINTS = 5000
+
+# Reports the dataZoom range (percent start, end) back to Python
+ZOOM_EVENTS = {
+    "datazoom": "function(params) { var p = params.batch ? params.batch[0] : params; return [p.start, p.end]; }"
+}
+
+def load_collection(collection, columns, query=None):
+    """Pull matching documents from MongoDB, projected to `columns` when given"""
+    query = query or {}
+    if columns is None:
+        return pd.DataFrame(list(collection.find(query)))
+    if bulk_loader.supports(collection.name, columns):
+        return bulk_loader.load_frame(collection, columns, query)
+    projection = {col: 1 for col in columns}
+    projection["_id"] = 0
+    return pd.DataFrame(list(collection.find(query, projection)), columns=list(columns))
 
 @st.cache_data(ttl=3600)
-def fetch_data(collection_name):
-    """Fetch data from MongoDB with connection pooling"""
+def fetch_data(collection_name, columns=None):
+    """Fetch data from the local snapshot, syncing new documents from MongoDB when it is stale"""
     try:
         client = init_connection()
         db = client.tourism_db
-        return pd.DataFrame(list(db[collection_name].find()))
+        return snapshots.load(db[collection_name], columns, load_collection)
     except Exception as e:
         st.error(f"Error fetching {collection_name}: {str(e)}")
         return pd.DataFrame()
 
-def mistral_analysis(prompt, data):
-    """Generate investment insights using Mistral AI"""
+@st.cache_data(ttl=3600)
+def aggregate_data(collection_name, pipeline):
+    """Run an aggregation pipeline in MongoDB and return only the grouped rows"""
     try:
-        # Calculate metrics
-        metrics = calculate_market_metrics(data)
-        
-        # Create analysis message
-        messages = [
-            {
-                "role": "system",
-                "content": "You are a real estate market analysis expert. Analyze the data and provide detailed insights. Add necessary emoji to make conversation looks more fun to read"
-            },
-            {
-                "role": "user",
-                "content": f"""
-                Based on the provided real estate market data:
-                
-                {prompt}
-                
-                Key metrics:
-                {metrics}
-                
-                Provide a detailed analysis structured in sections according to the prompt
-                """
-            }
-        ]
-        
-        # Generate analysis
-        response = client.chat.complete(
-            model=MODEL,
-            messages=messages
-        )
-        
-        st.write(response.choices[0].message.content)
-        
-        return response.choices[0].message.content
-        
+        client = init_connection()
+        db = client.tourism_db
+        result = pd.DataFrame(list(db[collection_name].aggregate(pipeline)))
+        result.attrs["version"] = snapshots.state_version(snapshots.collection_state(db[collection_name]))
+        return result
+    except Exception as e:
+        st.error(f"Error aggregating {collection_name}: {str(e)}")
+        return pd.DataFrame()
+
+def run_concurrently(calls):
+    """Run (function, *args) calls on worker threads attached to this script run.
+
+    This is the one batching entry point for a tab's loads: fetch_data,
+    aggregate_data and get_dataset calls mix freely in a batch, and each
+    still fills its own cache entry.
+    """
+    ctx = get_script_run_ctx()
+
+    def run(call):
+        add_script_run_ctx(ctx=ctx)
+        func, *args = call
+        return func(*args)
+
+    if not calls:
+        return []
+    with ThreadPoolExecutor(max_workers=min(MAX_POOL_SIZE, len(calls))) as pool:
+        return list(pool.map(run, calls))
+
+@st.cache_resource(ttl=3600)
+def load_dataset(name):
+    """Load a shared dataset once per process with its dtypes normalized"""
+    spec = DATASETS[name]
+    try:
+        client = init_connection()
+        db = client.tourism_db
+        frame, delta = snapshots.sync(db[spec["collection"]], spec["columns"], load_collection)
+        if name in rollups.ROLLUPS:
+            rollups.update(name, frame, delta)
+        normalized = normalize(frame, spec)
+        normalized.attrs["version"] = frame.attrs.get("version")
+        return normalized
+    except Exception as e:
+        st.error(f"Error loading {spec['collection']}: {str(e)}")
+        return pd.DataFrame(columns=list(spec["columns"]))
+
+def get_dataset(name):
+    """Read-only view of a shared dataset.
+
+    The view shares the cached data, so callers may add or replace columns on
+    it but must never modify values in place (inplace=True, .loc assignment).
+    """
+    return load_dataset(name).copy(deep=False)
+
+def get_datasets(names):
+    """Read-only views of several shared datasets, loaded concurrently"""
+    return run_concurrently([(get_dataset, name) for name in names])
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def rent_summaries(version):
+    """Quarterly trend, top-area and property-type frames read from the rents rollup"""
+    table = rollups.read("rents", version)
+    if table is None:
+        table = rollups.rollup(load_dataset("rents"), rollups.ROLLUPS["rents"])
+    summaries = (
+        rollups.quarterly_summary(table),
+        rollups.top_means(table, "Area", limit=10),
+        rollups.dimension_counts(table, "Property Type")
+    )
+    for summary in summaries:
+        summary.attrs["version"] = version
+    return summaries
+
+# Datasets offered for AI analysis: registry name, metric column and grouping column
+ANALYSIS_DATASETS = {
+    "Rental Market": ("rents", "Contract Amount", "Area"),
+    "GDP Growth": ("gdp", "Value", None),
+    "Consumer Price Index": ("cpi", "Value", None),
+    "Population": ("population", "Value", None),
+    "Property Transactions": ("transactions", "Amount", None)
+}
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def metric_summary(name, version, value, group, _frame):
+    """Quarterly prefix aggregates of a dataset, built once per data version and shared read-only"""
+    return market_metrics.build_summary(_frame, value, group)
+
+def market_summaries(labels):
+    """Metric summaries for the selected analysis datasets, by display name"""
+    specs = [ANALYSIS_DATASETS[label] for label in labels]
+    frames = get_datasets([name for name, _, _ in specs])
+    return {
+        label: metric_summary(name, frame.attrs.get("version"), value, group, frame)
+        for label, (name, value, group), frame in zip(labels, specs, frames)
+    }
+
+@st.cache_resource(ttl=3600, max_entries=128, show_spinner=False)
+def chart_option(name, version, state, _data):
+    """ECharts option built once per (chart, data version, widget state) and shared read-only"""
+    return chart_options.BUILDERS[name](_data, *state)
+
+def chart(name, data, *state, version=None):
+    """Option for the named chart, memoized when its data carries a version tag"""
+    version = version or data.attrs.get("version")
+    if version is None:
+        return chart_options.BUILDERS[name](data, *state)
+    return chart_option(name, version, state, data)
+
+@st.cache_resource
+def llm_orchestrator():
+    """Process-wide LLM request layer, so identical requests coalesce across sessions"""
+    return LLMOrchestrator(client, MAX_LLM_CONCURRENCY, LLM_REQUESTS_PER_SECOND, LLM_BURST, LLM_TIMEOUT)
+
+def analysis_messages(prompt, metrics):
+    """Chat messages asking Mistral to analyse the selected data"""
+    return [
+        {
+            "role": "system",
+            "content": "You are a real estate market analysis expert. Analyze the data and provide detailed insights. Add necessary emoji to make conversation looks more fun to read"
+        },
+        {
+            "role": "user",
+            "content": f"""
+            Based on the provided real estate market data:
+            
+            {prompt}
+            
+            Key metrics:
+            {metrics}
+            
+            Provide a detailed analysis structured in sections according to the prompt
+            """
+        }
+    ]
+
+def request_analysis(prompt, metrics):
+    """Start, or join, the Mistral request for a prompt without waiting for it"""
+    try:
+        return llm_orchestrator().request(MODEL, analysis_messages(prompt, metrics))
+    except Exception as e:
+        return Flight.failed(e)
+
+def mistral_analysis(flight):
+    """Render a Mistral analysis as it streams in and return the full text"""
+    try:
+        return st.write_stream(flight.follow(LLM_TIMEOUT))
     except Exception as e:
         return f"Error in AI analysis: {str(e)}"
 
-def calculate_market_metrics(data):
-    """Calculate key market metrics from datasets"""
+def growth(value):
+    """Signed percentage, or n/a when there is no comparison period"""
+    return f"{value:+.1f}%" if pd.notna(value) else "n/a"
+
+def number(value, spec, unit=""):
+    """Formatted value with its unit, or n/a when the range holds no data"""
+    return f"{value:{spec}}{unit}" if pd.notna(value) else "n/a"
+
+def calculate_market_metrics(summaries, start_date, end_date):
+    """Key market metrics for a date range, read from precomputed quarterly summaries"""
     metrics = []
-    
-    for name, df in data.items():
+
+    for name, summary in summaries.items():
+        m = market_metrics.range_metrics(summary, start_date, end_date)
+        if m is None:
+            continue
+        period = f"{m['first_quarter']} to {m['last_quarter']}"
+        observed = f"{m['first_observed']} to {m['latest_observed']}"
+        quartiles = m["quantiles"]
+
         if name == "Rental Market":
-            metrics.append(f"Average Rent: {df['Contract Amount'].mean():,.0f} AED")
-            metrics.append(f"Rental Volume: {len(df):,} transactions")
-            
+            metrics.append(f"Average Rent: {number(m['mean'], ',.0f', ' AED')}")
+            metrics.append(
+                "Rent Quartiles (25th/median/75th): "
+                + " / ".join(number(quartiles[q], ",.0f") for q in (0.25, 0.5, 0.75)) + " AED"
+            )
+            metrics.append(f"Rental Volume: {m['rows']:,} transactions")
+            metrics.append(f"Average Rent YoY (last 4 quarters): {growth(m['yoy_mean'])}")
+            metrics.append(f"Rental Volume YoY (last 4 quarters): {growth(m['yoy_rows'])}")
+            metrics.append(f"Quarterly Rental Volume {period}: {m['first_rows']:,} to {m['latest_rows']:,}")
+            if len(m["group_medians"]):
+                areas = ", ".join(f"{area} {median:,.0f} AED" for area, median in m["group_medians"].items())
+                metrics.append(f"Highest Median Rents by Area: {areas}")
+
         elif name == "GDP Growth":
-            metrics.append(f"GDP Growth Rate: {df['Value'].mean():.1f}%")
-            
+            metrics.append(f"GDP Growth Rate: {number(m['mean'], '.1f', '%')}")
+            metrics.append(f"Latest Quarter GDP Growth Rate ({m['latest_observed']}): {number(m['latest_mean'], '.1f', '%')}")
+
+        elif name == "Consumer Price Index":
+            metrics.append(f"CPI {observed}: {number(m['first_mean'], '.1f')} to {number(m['latest_mean'], '.1f')}")
+            metrics.append(f"CPI YoY (last 4 quarters): {growth(m['yoy_mean'])}")
+
+        elif name == "Population":
+            metrics.append(f"Population {observed}: {number(m['first_mean'], ',.0f')} to {number(m['latest_mean'], ',.0f')}")
+
         elif name == "Property Transactions":
-            metrics.append(f"Transaction Volume: {len(df):,}")
-            metrics.append(f"Average Transaction Value: {df['Amount'].mean():,.0f} AED")
-    
+            metrics.append(f"Transaction Volume: {m['rows']:,}")
+            metrics.append(f"Average Transaction Value: {number(m['mean'], ',.0f', ' AED')}")
+            metrics.append(f"Median Transaction Value: {number(quartiles[0.5], ',.0f', ' AED')}")
+            metrics.append(f"Transaction Volume YoY (last 4 quarters): {growth(m['yoy_rows'])}")
+            metrics.append(f"Quarterly Transaction Volume {period}: {m['first_rows']:,} to {m['latest_rows']:,}")
+
     return "\n".join(metrics)
 
-def generate_market_insights(data, start_date, end_date):
-    """Generate structured market insights using Mistral"""
-    prompt = f"""
+def market_insights_prompt(start_date, end_date):
+    return f"""
     Analyze Dubai real estate market data ({start_date} to {end_date}):
     1. Current market phase and trends
     2. Investment opportunities by area/type
     """
-    
+
+def generate_market_insights(flight):
+    """Generate structured market insights using Mistral"""
     try:
-        analysis = mistral_analysis(prompt, data)
+        analysis = mistral_analysis(flight)
         return {
             'market_analysis': extract_section(analysis, 'Market Analysis'),
             'opportunities': extract_section(analysis, 'Opportunities'),
@@ -120,72 +318,16 @@ def generate_market_insights(data, start_date, end_date):
             'risks': "Unable to assess risks"
         }
 
-def generate_risk_strategies(data):
+RISK_PROMPT = "Analyze market risks and suggest mitigation strategies, specifically only focuses on the risk factors and management"
+
+def generate_risk_strategies(flight):
     """Generate risk management strategies using Mistral"""
-    prompt = "Analyze market risks and suggest mitigation strategies, specifically only focuses on the risk factors and management"
-    
     try:
-        analysis = mistral_analysis(prompt, data)
+        analysis = mistral_analysis(flight)
         return parse_risk_analysis(analysis)
     except Exception as e:
         return default_risk_strategies()
 
-def filter_dataset_by_date(df, start_date, end_date):
-    """Filter dataset by date range with proper date format handling"""
-    try:
-        df = df.copy()
-        
-        if 'Quarter' in df.columns:
-            def parse_quarter(q):
-                try:
-                    if pd.isna(q):
-                        return pd.NaT
-                        
-                    q = str(q).strip()
-                    
-                    # Handle "2023Q3" format
-                    if len(q) == 6 and q[4] == 'Q':
-                        year = int(q[:4])
-                        quarter = int(q[5])
-                    # Handle "Q3-2023" format    
-                    elif q.startswith('Q') and '-' in q:
-                        parts = q.split('-')
-                        quarter = int(parts[0][1])
-                        year = int(parts[1])
-                    else:
-                        return pd.NaT
-                    
-                    if not (1 <= quarter <= 4):
-                        return pd.NaT
-                        
-                    month = ((quarter - 1) * 3) + 1
-                    return pd.Timestamp(f"{year}-{month:02d}-01")
-                    
-                except (ValueError, IndexError, TypeError):
-                    return pd.NaT
-
-            # Convert quarters to dates
-            df['Quarter'] = df['Quarter'].apply(parse_quarter)
-            date_col = 'Quarter'
-            
-        elif 'Time Period' in df.columns:
-            date_col = 'Time Period'
-            df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
-        else:
-            return df
-
-        # Clean data
-        df = df.dropna(subset=[date_col])
-            
-        # Filter by date range
-        start_ts = pd.Timestamp(start_date)
-        end_ts = pd.Timestamp(end_date)
-        return df[df[date_col].between(start_ts, end_ts)]
-        
-    except Exception as e:
-        st.error(f"Error filtering data: {str(e)}")
-        return df
-
 def default_risk_strategies():
     """Default risk strategies when analysis fails"""
     return {
@@ -287,36 +429,28 @@ def config():
         </style>
     """, unsafe_allow_html=True)
 
-def parse_quarter(q_str):
-    year = int(q_str[:4])
-    quarter = int(q_str[-1])
-    return pd.Period(year=year, quarter=quarter, freq='Q')
-
-def prepare_chart_data(df):
-    """Clean and prepare data for charts"""
-    return [float(x) if pd.notnull(x) else None for x in df]
-
-def get_coordinates(address):
-    url = f"https://api.geoapify.com/v1/geocode/search?text={address}, Dubai, UAE&apiKey={GEOAPIFY}"
-    headers = CaseInsensitiveDict()
-    headers["Accept"] = "application/json"
-
-    resp = requests.get(url, headers=headers)
-    if resp.status_code == 200:
-        data = resp.json()
-        if data['features']:
-            lat = data['features'][0]['properties']['lat']
-            lon = data['features'][0]['properties']['lon']
-            return lat, lon
-    return 0, 0
-    
+@st.cache_data(max_entries=4, show_spinner=False)
+def rental_density_grids(_rental_data, version):
+    """Rental points binned into density grids once per rents dataset version"""
+    return density_grids(_rental_data)
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def property_map_html(_rental_data, version):
+    """Rendered property map HTML, rebuilt only when the rents dataset version changes"""
+    grids = rental_density_grids(_rental_data, version)
+    return render_map_html(_rental_data, grids, width=700, height=500)
+
 def market_overview_tab():
     # Fetch data from MongoDB collections
-    hotel_ratings = fetch_data("hotel_establishments_and_rooms_by_rating_type")
-    guests_data = fetch_data("guests_by_hotel_type_by_region")
-    revenue_data = fetch_data("hotel_establishments_main_indicators")
-    rental_data = fetch_data("rents_quarterly")
-    transactions_data = fetch_data("transactions_df_quarterly_data")
+    hotel_indicators, guests_data, revenue_data, rental_data, transactions_data = run_concurrently([
+        (aggregate_data, "hotel_establishments_and_rooms_by_rating_type", hotel_indicator_pipeline()),
+        (fetch_data, "guests_by_hotel_type_by_region", HOTEL_COLUMNS),
+        (fetch_data, "hotel_establishments_main_indicators", HOTEL_COLUMNS),
+        (get_dataset, "rents"),
+        (get_dataset, "transactions")
+    ])
+    # Rent trend, area and property-type views come from the pre-aggregated rollup
+    quarterly_rentals, area_rent, property_dist = rent_summaries(rental_data.attrs.get("version"))
     
     col1, col2 = st.columns(2)
     
@@ -324,342 +458,150 @@ def market_overview_tab():
         st.markdown(f"""
                 <h4>🏨 Hotel Indicators Growth</h4>
         """, unsafe_allow_html=True)
-        
-        # Process hotel establishments data
-        hotel_estab_data = hotel_ratings.groupby(['Time Period', 'Hotel Indicator'])['Value'].mean().unstack().reset_index()
-        hotel_chart = {
-            # "title": {"text": "Hotel Indicators Growth"},
-            "tooltip": {"trigger": "axis"},
-            "legend": {"data": ["Hotel Establishments", "Rooms"]},
-            "xAxis": {"type": "category", "data": hotel_estab_data['Time Period'].tolist()},
-            "yAxis": [
-            {"type": "value", "name": "Hotel Establishments"},
-            {"type": "value", "name": "Rooms"}
-            ],
-            "series": [
-            {
-                "name": "Hotel Establishments",
-                "data": hotel_estab_data['Hotel Establishments'].tolist(),
-                "type": "line",
-                "smooth": True
-            },
-            {
-                "name": "Rooms",
-                "data": hotel_estab_data['Rooms'].tolist(),
-                "type": "line",
-                "smooth": True,
-                "yAxisIndex": 1
-            }
-            ],
-            "dataZoom": [{"type": "slider"}]
-        }
-        st_echarts(hotel_chart)
+        st_echarts(chart("hotel_chart", hotel_indicators))
         
         # Guest nights chart below
         st.markdown("""
             <h4>👥 Guest Nights Analysis</h4>
         """, unsafe_allow_html=True)
-        
-        guest_hotels = guests_data[guests_data['Hotel Indicator'] == 'Guests - Hotels'].sort_values('Time Period')
-        guest_nights = guests_data[guests_data['Hotel Indicator'] == 'Guest Nights'].sort_values('Time Period')
-        guest_chart = {
-            "tooltip": {"trigger": "axis"},
-            "legend": {"data": ["Guest Nights", "Hotel Guests"]},
-            "xAxis": {"type": "category", "data": guest_nights['Time Period'].tolist()},
-            "yAxis": {"type": "value"},
-            "series": [
-                {
-                    "name": "Guest Nights",
-                    "data": guest_nights['Value'].tolist(),
-                    "type": "bar"
-                },
-                {
-                    "name": "Hotel Guests",
-                    "data": guest_hotels['Value'].tolist(),
-                    "type": "bar"
-                }
-            ],
-            "dataZoom": [{"type": "slider"}]
-        }
-        st_echarts(guest_chart)
+        st_echarts(chart("guest_chart", guests_data))
         
         # Rental Analysis
         st.markdown("""
             <h4>🏢 Rental Trends Analysis</h4>
         """, unsafe_allow_html=True)
 
-        # Convert relevant columns to numeric
-        rental_data['Contract Amount'] = pd.to_numeric(rental_data['Contract Amount'], errors='coerce')
-        rental_data['Property Size (sq.m)'] = pd.to_numeric(rental_data['Property Size (sq.m)'], errors='coerce')
-
-        # Parse and sort quarters
-        rental_data['Quarter'] = rental_data['Quarter'].apply(parse_quarter)
-        rental_data = rental_data.sort_values('Quarter')
-
         # Rental trends over time
-        quarterly_rentals = rental_data.groupby('Quarter')['Contract Amount'].agg(['mean', 'count']).reset_index()
-        formatted_quarters = quarterly_rentals['Quarter'].dt.strftime('%Y-Q%q').tolist()
-
-        rental_trend_chart = {
-            "tooltip": {"trigger": "axis"},
-            "legend": {"data": ["Average Rent", "Number of Contracts"]},
-            "xAxis": {
-                "type": "category", 
-                "data": formatted_quarters,
-                "axisLabel": {"rotate": 45}
-            },
-            "yAxis": [
-                {"type": "value", "name": "Average Rent (AED)"}, 
-                {"type": "value", "name": "Number of Contracts"}
-            ],
-            "series": [
-                {
-                    "name": "Average Rent",
-                    "data": quarterly_rentals['mean'].round(2).tolist(),
-                    "type": "line",
-                    "smooth": True
-                },
-                {
-                    "name": "Number of Contracts", 
-                    "data": quarterly_rentals['count'].tolist(),
-                    "type": "bar",
-                    "yAxisIndex": 1
-                }
-            ],
-            "dataZoom": [{"type": "slider"}],
-            "grid": {"bottom": "15%"}
-        }
-        st_echarts(rental_trend_chart)
+        st_echarts(chart("rental_trend_chart", quarterly_rentals))
 
         # Property type distribution
         st.markdown("<h5>Property Type Distribution</h5>", unsafe_allow_html=True)
-        property_dist = rental_data['Property Type'].value_counts()
-        
-        property_pie = {
-            "tooltip": {"trigger": "item"},
-            "legend": {"orient": "horizontal", "bottom": "bottom"},
-            "series": [{
-            "type": "pie",
-            "data": [{"value": v, "name": k} for k,v in property_dist.items()],
-            "radius": "50%"
-            }]
-        }
-        st_echarts(property_pie)
+        st_echarts(chart("property_pie", property_dist))
 
         # Area-wise average rent 
         st.markdown("<h5>Average Rent by Area</h5>", unsafe_allow_html=True)
-        area_rent = rental_data.groupby('Area')['Contract Amount'].mean().sort_values(ascending=False)
-
-        area_bar = {
-            "tooltip": {"trigger": "axis"},
-            "xAxis": {
-            "type": "category",
-            "data": area_rent.index.tolist()[:10],
-            "axisLabel": {"rotate": 45}
-            },
-            "yAxis": {"type": "value"},
-            "series": [{
-            "data": area_rent.values.round(2).tolist()[:10],
-            "type": "bar",
-            "name": "Average Rent"
-            }]
-        }
-        st_echarts(area_bar)
+        st_echarts(chart("area_bar", area_rent))
 
     
     with col2:
         st.markdown("""
             <h4>💰 Guest Nights & Room Revenue Trends</h4>
         """, unsafe_allow_html=True)
-        
-        # Process revenue data
-        guest_nights = revenue_data[revenue_data['Hotel Indicator'] == 'Guest Nights'].sort_values('Time Period')
-        room_revenue = revenue_data[revenue_data['Hotel Indicator'] == 'Room Revenue'].sort_values('Time Period')
-        
-        # Create DataFrame with aligned time periods
-        merged_data = pd.merge(
-            guest_nights[['Time Period', 'Value']].rename(columns={'Value': 'Guest Nights'}),
-            room_revenue[['Time Period', 'Value']].rename(columns={'Value': 'Room Revenue'}),
-            on='Time Period',
-            how='inner'
-        )
-        
-        revenue_chart = {
-            "tooltip": {"trigger": "axis"},
-            "legend": {"data": ["Guest Nights", "Room Revenue"]},
-            "xAxis": {"type": "category", "data": merged_data['Time Period'].tolist()},
-            "yAxis": [
-            {"type": "value", "name": "Guest Nights"},
-            {"type": "value", "name": "Room Revenue (AED)"}
-            ],
-            "series": [
-            {
-                "name": "Guest Nights",
-                "data": merged_data['Guest Nights'].tolist(),
-                "type": "line",
-                "smooth": True
-            },
-            {
-                "name": "Room Revenue",
-                "data": merged_data['Room Revenue'].tolist(),
-                "type": "line", 
-                "smooth": True,
-                "yAxisIndex": 1
-            }
-            ],
-            "dataZoom": [{"type": "slider"}]
-        }
-        st_echarts(revenue_chart)
+        st_echarts(chart("revenue_chart", revenue_data))
         
         st.markdown("""
             <h4>🏠 Property Transaction Analysis</h4>
         """, unsafe_allow_html=True)
-
-        # Convert and sort quarters
-        transactions_data['Quarter'] = transactions_data['Quarter'].apply(parse_quarter)
-        transactions_data = transactions_data.sort_values('Quarter')
-
-        # Format quarters for display
-        formatted_quarters = transactions_data['Quarter'].dt.strftime('%Y-Q%q').tolist()
-
-        transactions_chart = {
-            "tooltip": {"trigger": "axis"},
-            "legend": {"data": ["Transaction Amount", "Transaction Size"]},
-            "xAxis": {
-                "type": "category", 
-                "data": formatted_quarters,
-                "axisLabel": {
-                    "rotate": 45
-                }
-            },
-            "yAxis": [
-                {"type": "value", "name": "Amount (AED)"},
-                {"type": "value", "name": "Size (sq.m)"}
-            ],
-            "series": [
-                {
-                    "name": "Transaction Amount",
-                    "type": "line",
-                    "data": transactions_data['Amount'].tolist(),
-                    "smooth": True
-                },
-                {
-                    "name": "Transaction Size",
-                    "type": "line",
-                    "yAxisIndex": 1,
-                    "data": transactions_data['Transaction Size (sq.m)'].tolist(),
-                    "smooth": True
-                }
-            ],
-            "dataZoom": [{"type": "slider"}],
-            "grid": {
-                "bottom": "15%"
-            }
-        }
-        st_echarts(transactions_chart)
+        st_echarts(chart("transactions_chart", transactions_data))
 
         # Scatter plot of amount vs size
         st.markdown("""
             <h4>📈 Transaction Size vs Amount</h4>
         """, unsafe_allow_html=True)
-        
-        scatter_chart = {
-            "tooltip": {"trigger": "item"},
-            "xAxis": {"type": "value", "name": "Transaction Size (sq.m)"},
-            "yAxis": {"type": "value", "name": "Amount (AED)"},
-            "series": [{
-            "type": "scatter",
-            "data": [[size, amount] for size, amount in zip(
-            transactions_data['Transaction Size (sq.m)'].tolist(),
-            transactions_data['Amount'].tolist()
-            )],
-            "symbolSize": 10
-            }]
-        }
-        st_echarts(scatter_chart)
+        st_echarts(chart("scatter_chart", transactions_data, MAX_SCATTER_POINTS))
         
         
-        # Create a base map centered on Dubai
-        def create_map():
-            # Create a base map centered on Dubai
-            m = folium.Map(location=[25.2048, 55.2708], zoom_start=6)
-
-            # Filter out rows with missing coordinates and get unique lat/long combinations
-            valid_data = rental_data[
-                rental_data['Latitude'].notna() & 
-                rental_data['Longitude'].notna()
-            ].drop_duplicates(subset=['Latitude', 'Longitude'])
-
-            # Create markers for each unique location
-            for _, row in valid_data.iterrows():
-                popup_html = f"""
-                <b>Area:</b> {row['Area']}<br>
-                <b>Property Type:</b> {row['Property Type']}<br>
-                <b>Property Sub Type:</b> {row['Property Sub Type']}<br>
-                <b>Usage:</b> {row['Usage']}<br>
-                <b>Contract Amount:</b> {row['Contract Amount']:,.0f} AED<br>
-                <b>Nearest Metro:</b> {row['Nearest Metro']}<br>
-                <b>Nearest Mall:</b> {row['Nearest Mall']}<br>
-                <b>Nearest Landmark:</b> {row['Nearest Landmark']}
-                """
-                
-                folium.Marker(
-                    [row['Latitude'], row['Longitude']], 
-                    popup=folium.Popup(popup_html, max_width=300),
-                    tooltip=row['Area']
-                ).add_to(m)
-            
-            heat_data = valid_data[['Latitude', 'Longitude']].values.tolist()
-            folium.plugins.HeatMap(heat_data).add_to(m)
-            
-            return m
-
-        # Display the map
-        m = create_map()
-        # Add heatmap
         st.markdown("<h4>📍 Property Density Heatmap</h4>", unsafe_allow_html=True)
-        folium_static(m, width=700, height=500)
+        components.html(property_map_html(rental_data, rental_data.attrs.get("version")), width=700, height=510)
+
+
+# Interactive chart blocks run as fragments: a widget change reruns only its own block
+
+@st.fragment
+def gdp_fragment(gdp_measures):
+    """GDP measure picker and chart"""
+    # Add measure selection
+    available_measures = gdp_measures.columns.tolist()
+    # Add measure selection with a more descriptive label and help text
+    col_gdp, col_gdp_all = st.columns([3,1])
+    with col_gdp_all:
+        if st.button('Select All GDP'):
+            selected_measures = available_measures
+            with col_gdp:
+                selected_measures = st.multiselect(
+                'Choose GDP Growth Rate Indicators',
+                selected_measures,
+                default=selected_measures,
+                help="Select one or more GDP measures to visualize their trends over time. Multiple selections will allow you to compare different growth rates."
+                )
+        else:
+            with col_gdp:
+                selected_measures = st.multiselect(
+                'Choose GDP Growth Rate Indicators',
+                available_measures,
+                default=available_measures[:3],
+                help="Select one or more GDP measures to visualize their trends over time. Multiple selections will allow you to compare different growth rates."
+                )
+    if selected_measures:
+        st_echarts(chart("gdp_chart", gdp_measures, tuple(selected_measures)))
+    else:
+        st.warning("Please select at least one measure to display")
+
+@st.fragment
+def cpi_fragment(cpi_pivot, cpi_divisions):
+    """CPI division picker and chart"""
+    col_select, col_select_all = st.columns([3,1])
+    with col_select_all:
+        if st.button('Select All'):
+            selected_divisions = cpi_divisions
+            with col_select:
+                st.multiselect(
+                    'Select CPI divisions to display',
+                    cpi_divisions,
+                    default=selected_divisions
+                )
+        else:
+            with col_select:
+                selected_divisions = st.multiselect(
+                    'Select CPI divisions to display',
+                    cpi_divisions,
+                    default=cpi_divisions[:3]
+                )
+
+    if selected_divisions:
+        st_echarts(chart("cpi_chart", cpi_pivot, tuple(selected_divisions)))
+
+@st.fragment
+def wdi_fragment(wdi_data):
+    """World Development Indicator picker and chart"""
+    # Add indicator selection
+    available_indicators = wdi_data['Indicator Name'].unique().tolist()
+    selected_indicator = st.selectbox(
+        'Select World Development Indicator',
+        available_indicators,
+        help="Choose an indicator to visualize its trend over time"
+    )
 
+    st_echarts(chart("indicator_chart", wdi_data, selected_indicator))
+
+@st.fragment
+def exchange_fragment(aed_to_usd):
+    """AED to USD line, downsampled with more detail inside the zoomed range"""
+    window = st.session_state.get("exchange_zoom_window")
+    exchange_chart, indices = chart("exchange_chart", aed_to_usd, window, MAX_LINE_POINTS)
+    zoom = st_echarts(exchange_chart, events=ZOOM_EVENTS, key="exchange_chart")
+
+    # Re-sample around the new range once per slider move
+    if zoom and zoom != st.session_state.get("exchange_zoom_event"):
+        st.session_state["exchange_zoom_event"] = zoom
+        st.session_state["exchange_zoom_window"] = window_from_zoom(indices, *zoom)
+        st.rerun(scope="fragment")
 
 def macroeconomic_tab():
-    aed_to_usd =fetch_data("aed_to_usd_df")
-    gdp_data =fetch_data("gdp_quarterly_current_prices_df")
-    population_data = fetch_data("population_indicators_df")
-    cpi_data = data = fetch_data("consumer_price_index_monthly_df")
-    wdi_data = data = fetch_data("world_development_indicator_df")
+    aed_to_usd, gdp_data, population_data, cpi_data, wdi_data = run_concurrently([
+        (fetch_data, "aed_to_usd_df", EXCHANGE_COLUMNS),
+        (get_dataset, "gdp"),
+        (get_dataset, "population"),
+        (get_dataset, "cpi"),
+        (fetch_data, "world_development_indicator_df")
+    ])
     col1, col2 = st.columns(2)
     with col1:
         st.markdown("""
             <h4>💵 AED to USD</h4>
         """, unsafe_allow_html=True)
 
-        # Process AED to USD data
-        aed_to_usd = aed_to_usd.sort_values('Date')
-        exchange_chart = {
-            "tooltip": {"trigger": "axis"},
-            "xAxis": {"type": "category", "data": aed_to_usd['Date'].tolist()},
-            "yAxis": {
-            "type": "value", 
-            "name": "Exchange Rate",
-            "min": aed_to_usd['Close'].min() * 0.99,  # Set min slightly below lowest value
-            "max": aed_to_usd['Close'].max() * 1.01   # Set max slightly above highest value
-            },
-            "series": [{
-            "data": aed_to_usd['Close'].tolist(),
-            "type": "line",
-            "smooth": True,
-            "name": "AED to USD",
-            "lineStyle": {"width": 2},  # Make line thicker
-            "markPoint": {
-                "data": [
-                {"type": "max", "name": "Maximum"},
-                {"type": "min", "name": "Minimum"}
-                ]
-            }
-            }],
-            "dataZoom": [{"type": "slider"}]
-        }
-        st_echarts(exchange_chart)
+        exchange_fragment(aed_to_usd)
 
         # Process GDP data
         # Process GDP data
@@ -669,48 +611,9 @@ def macroeconomic_tab():
         
         # Group and pivot GDP data by Measure
         gdp_measures = gdp_data.groupby(['Time Period', 'Measure'])['Value'].mean().unstack()
+        gdp_measures.attrs.update(gdp_data.attrs)
         
-        # Add measure selection
-        available_measures = gdp_measures.columns.tolist()
-        # Add measure selection with a more descriptive label and help text
-        col_gdp, col_gdp_all = st.columns([3,1])
-        with col_gdp_all:
-            if st.button('Select All GDP'):
-                selected_measures = available_measures
-                with col_gdp:
-                    selected_measures = st.multiselect(
-                    'Choose GDP Growth Rate Indicators',
-                    selected_measures,
-                    default=selected_measures,
-                    help="Select one or more GDP measures to visualize their trends over time. Multiple selections will allow you to compare different growth rates."
-                    )
-            else:
-                with col_gdp:
-                    selected_measures = st.multiselect(
-                    'Choose GDP Growth Rate Indicators',
-                    available_measures,
-                    default=available_measures[:3],
-                    help="Select one or more GDP measures to visualize their trends over time. Multiple selections will allow you to compare different growth rates."
-                    )
-        if selected_measures:
-            gdp_chart = {
-            "tooltip": {"trigger": "axis"},
-            # "legend": {"data": selected_measures},
-            "xAxis": {"type": "category", "data": gdp_measures.index.astype(str).tolist()},
-            "yAxis": {"type": "value", "name": "Growth Rate (%)"},
-            "series": [
-            {
-                "name": measure,
-                "data": gdp_measures[measure].tolist(),
-                "type": "line",
-                "smooth": True
-            } for measure in selected_measures
-            ],
-            "dataZoom": [{"type": "slider"}]
-            }
-            st_echarts(gdp_chart)
-        else:
-            st.warning("Please select at least one measure to display")
+        gdp_fragment(gdp_measures)
 
     
     with col2:        
@@ -718,27 +621,7 @@ def macroeconomic_tab():
             <h4>👥 Population Indicators</h4>
         """, unsafe_allow_html=True)
 
-        population_data = population_data.sort_values('Time_Period')
-        pop_chart = {
-            "tooltip": {"trigger": "axis"},
-            "legend": {"data": ["Population Indicators"]},
-            "xAxis": {"type": "category", "data": population_data['Time_Period'].astype(str).tolist()},
-            "yAxis": {"type": "value", "name": "Value"},
-            "series": [{
-                "name": "Population Indicators",
-                "data": population_data['Value'].tolist(),
-                "type": "line",
-                "smooth": True,
-                "markPoint": {
-                    "data": [
-                        {"type": "max", "name": "Max"},
-                        {"type": "min", "name": "Min"}
-                    ]
-                }
-            }],
-            "dataZoom": [{"type": "slider"}]
-        }
-        st_echarts(pop_chart)
+        st_echarts(chart("population_chart", population_data))
         # Process CPI data
         st.markdown("<h4>📊 Consumer Price Index by Category</h4>", unsafe_allow_html=True)
         cpi_pivot = cpi_data.pivot_table(
@@ -750,99 +633,26 @@ def macroeconomic_tab():
         
         # Replace NaN values with None
         cpi_pivot = cpi_pivot.where(pd.notnull(cpi_pivot), None)
+        cpi_pivot.attrs.update(cpi_data.attrs)
 
         cpi_divisions = cpi_data['CPI Division'].unique().tolist()
-        col_select, col_select_all = st.columns([3,1])
-        with col_select_all:
-            if st.button('Select All'):
-                selected_divisions = cpi_divisions
-                with col_select:
-                    st.multiselect(
-                        'Select CPI divisions to display',
-                        cpi_divisions,
-                        default=selected_divisions
-                    )
-            else:
-                with col_select:
-                    selected_divisions = st.multiselect(
-                        'Select CPI divisions to display',
-                        cpi_divisions,
-                        default=cpi_divisions[:3]
-                    )
-
-        if selected_divisions:
-            cpi_chart = {
-                "tooltip": {"trigger": "axis"},
-                "xAxis": {"type": "category", "data": cpi_pivot['Time Period'].tolist()},
-                "yAxis": {"type": "value", "name": "CPI Value"},
-                "series": [
-                    {
-                        "name": division,
-                        "type": "line",
-                        "smooth": True,
-                        "data": [None if pd.isna(x) else x for x in cpi_pivot[division].tolist()]
-                    } for division in selected_divisions
-                ],
-                "dataZoom": [{"type": "slider"}]
-            }
-            st_echarts(cpi_chart)
+        cpi_fragment(cpi_pivot, cpi_divisions)
 
         # Process World Development Indicator data
         st.markdown("<h4>🌍 World Development Indicators</h4>", unsafe_allow_html=True)
 
-        # Convert years to numeric columns
-        year_columns = [str(year) for year in range(1960, 2024)]
-        
-        # Add indicator selection
-        available_indicators = wdi_data['Indicator Name'].unique().tolist()
-        selected_indicator = st.selectbox(
-            'Select World Development Indicator',
-            available_indicators,
-            help="Choose an indicator to visualize its trend over time"
-        )
-
-        # Filter data for selected indicator
-        indicator_data = wdi_data[wdi_data['Indicator Name'] == selected_indicator]
-        indicator_values = [indicator_data[year].iloc[0] for year in year_columns if year in indicator_data.columns]
-        valid_years = [year for year in year_columns if year in indicator_data.columns]
-
-        indicator_chart = {
-            "tooltip": {"trigger": "axis"},
-            "xAxis": {"type": "category", "data": valid_years},
-            "yAxis": {"type": "value", "name": selected_indicator},
-            "series": [{
-            "name": selected_indicator,
-            "type": "line",
-            "data": indicator_values,
-            "smooth": True,
-            "markPoint": {
-                "data": [
-                {"type": "max", "name": "Maximum"},
-                {"type": "min", "name": "Minimum"}
-                ]
-            }
-            }],
-            "dataZoom": [{"type": "slider"}]
-        }
-        st_echarts(indicator_chart)
+        wdi_fragment(wdi_data)
 
 def investment_tab():
-    # Fetch datasets
-    datasets = {
-        "Rental Market": fetch_data("rents_quarterly"),
-        "GDP Growth": fetch_data("gdp_quarterly_current_prices_df"),
-        "Consumer Price Index": fetch_data("consumer_price_index_monthly_df"),
-        "Population": fetch_data("population_indicators_df"),
-        "Property Transactions": fetch_data("transactions_df_quarterly_data")
-    }
+    datasets = list(ANALYSIS_DATASETS)
 
     # Sidebar controls
     with st.sidebar:
         st.markdown("### 📊 Analysis Configuration")
         selected_datasets = st.multiselect(
             "Select Data Sources",
-            list(datasets.keys()),
-            default=list(datasets.keys())[:2],
+            datasets,
+            default=datasets[:2],
             help="Choose datasets for analysis"
         )
 
@@ -857,6 +667,13 @@ def investment_tab():
             max_value=max_date
         )
 
+    # Prompt metrics come from per-version summaries, so moving the dates never rescans rows
+    metrics = calculate_market_metrics(market_summaries(selected_datasets), start_date, end_date) if selected_datasets else ""
+
+    # Both analyses run upstream concurrently; each column streams its own
+    insights_flight = request_analysis(market_insights_prompt(start_date, end_date), metrics) if selected_datasets else None
+    risk_flight = request_analysis(RISK_PROMPT, metrics)
+
     # Main content columns
     col1, col2 = st.columns([3, 2])
     
@@ -865,16 +682,10 @@ def investment_tab():
                 <h4>🎯 Investment Opportunities</h4>
         """, unsafe_allow_html=True)
 
-        # Prepare analysis data
-        analysis_data = {
-            name: filter_dataset_by_date(datasets[name], start_date, end_date)
-            for name in selected_datasets
-        }
-
         # Generate insights
-        if analysis_data:
+        if insights_flight:
             with st.spinner("Generating market insights..."):
-                insights = generate_market_insights(analysis_data, start_date, end_date)
+                insights = generate_market_insights(insights_flight)
         else:
             st.warning("Please select at least one dataset for analysis")
 
@@ -885,269 +696,169 @@ def investment_tab():
 
         # Generate risk mitigation strategies
         with st.spinner("Analyzing risks..."):
-            risk_analysis = generate_risk_strategies(analysis_data)
+            risk_analysis = generate_risk_strategies(risk_flight)
             
 
-def correlation_tab():
-    rental_data = fetch_data("rents_quarterly")
-    gdp_data = fetch_data("gdp_quarterly_current_prices_df")
-    cpi_data = fetch_data("consumer_price_index_monthly_df")
-    population_data = fetch_data("population_indicators_df")
-    
-    try:
-        rental_data['Quarter'] = pd.to_datetime(rental_data['Quarter'].apply(lambda x: x[:4] + '-' + str(int(x[-1]) * 3)), format='ISO8601')
-        rental_data['Quarter'] = rental_data['Quarter'].dt.to_period('Q').dt.end_time
-
-        # Create quarterly metrics
-        rental_metrics = rental_data.resample('QE', on='Quarter').agg({
-            'Contract Amount': 'mean',
-            'Quarter': 'count'
-        }).rename(columns={
-            'Contract Amount': 'Average_Rent',
-            'Quarter': 'Transaction_Volume'
-        })
-
-        # GDP data
-        gdp_data['Time Period'] = gdp_data.apply(lambda row: pd.Timestamp(f"{int(row['Time Period'])}-{int(row['Quarter'][-1])*3}-01"), axis=1)
-        
-        # Group by Time Period and sum values for the same date
-        gdp_data = gdp_data.groupby('Time Period', as_index=False)['Value'].sum()
-        
-        # Convert to quarterly data and handle duplicates
-        gdp_data['Time Period'] = pd.to_datetime(gdp_data['Time Period'])
-        gdp_growth = gdp_data \
-            .set_index('Time Period')['Value'] \
-            .resample('QE').sum() \
-            .drop_duplicates() \
-            .to_frame('GDP_Growth')
-
-
-        # CPI data
-        cpi_data['Time Period'] = pd.to_datetime(cpi_data['Time Period'])
-        cpi_quarterly = cpi_data.resample('QE', on='Time Period')['Value'].mean() \
-            .to_frame('CPI')
-
-        # Population data
-        population_data['Time_Period'] = pd.to_datetime(population_data['Time_Period'].astype(str) + '-01')
-
-        # Create quarterly data with unique indices
-        pop_quarterly = []
-        for _, row in population_data.iterrows():
-            year = row['Time_Period'].year
-            for quarter in range(1, 5):
-                quarter_date = pd.Timestamp(f"{year}-{3*quarter}-01")
-                pop_quarterly.append({
-                    'Time_Period': quarter_date,
-                    'Value': row['Value']
-                })
+# Indicators the rolling chart correlates with average rent, by aligned column
+ROLLING_PAIRS = {
+    'GDP': ('Rental_Average_Rent', 'GDP_GDP_Growth'),
+    'CPI': ('Rental_Average_Rent', 'CPI_CPI'),
+    'Population': ('Rental_Average_Rent', 'Population_Population')
+}
+
+# Lead/lag scan grid: leader shifts in quarters and lookback windows (None is the full history)
+LEAD_LAGS = range(1, 9)
+LEAD_LAG_WINDOWS = {
+    "Full history": None,
+    "Last 5 years": 20,
+    "Last 3 years": 12,
+    "Last 2 years": 8
+}
+
+@st.cache_data(max_entries=4)
+def correlation_payload(_datasets, version):
+    """Quarterly indicator series with their correlation matrix, rolling and lead/lag correlations, once per input version"""
+    rental_data, gdp_data, cpi_data, population_data, hotel_data = _datasets
+
+    rental_data = rental_data.assign(Quarter=rental_data['Quarter'].dt.end_time)
+
+    # Create quarterly metrics
+    rental_metrics = rental_data.resample('QE', on='Quarter').agg({
+        'Contract Amount': 'mean',
+        'Quarter': 'count'
+    }).rename(columns={
+        'Contract Amount': 'Average_Rent',
+        'Quarter': 'Transaction_Volume'
+    })
+
+    # GDP: quarterly values summed across measures
+    gdp_growth = to_quarterly(gdp_data['Value'], source="Q", agg="sum").to_frame('GDP_Growth')
+
+    # CPI: monthly values averaged per quarter
+    cpi_quarterly = to_quarterly(cpi_data['Value'], source="M").to_frame('CPI')
+
+    # Population: annual values carried over each quarter of their year
+    population_clean = to_quarterly(population_data['Value'], source="Y", agg="first", fill="ffill").to_frame('Population')
+
+    # Create common index
+    start_date = min(
+        rental_metrics.index.min(),
+        gdp_growth.index.min(),
+        cpi_quarterly.index.min(),
+        population_clean.index.min()
+    )
+    end_date = max(
+        rental_metrics.index.max(),
+        gdp_growth.index.max(),
+        cpi_quarterly.index.max(),
+        population_clean.index.max()
+    )
+    full_index = pd.date_range(start=start_date, end=end_date, freq='QE')
+
+    # Reindex all dataframes with common index
+    dfs = {
+        'Rental': rental_metrics,
+        'GDP': gdp_growth,
+        'CPI': cpi_quarterly,
+        'Population': population_clean
+    }
 
-        # Convert to DataFrame and ensure unique index
-        population_df = pd.DataFrame(pop_quarterly)
-        population_df = population_df.drop_duplicates('Time_Period')
-        population_clean = population_df.set_index('Time_Period')['Value'].to_frame('Population')
-
-        # Sort index and handle any remaining duplicates
-        population_clean = population_clean.sort_index()
-        population_clean = population_clean[~population_clean.index.duplicated(keep='first')]
-
-        # Create common index
-        start_date = min(
-            rental_metrics.index.min(),
-            gdp_growth.index.min(),
-            cpi_quarterly.index.min(),
-            population_clean.index.min()
-        )
-        end_date = max(
-            rental_metrics.index.max(),
-            gdp_growth.index.max(),
-            cpi_quarterly.index.max(),
-            population_clean.index.max()
+    aligned_dfs = []
+    for name, df in dfs.items():
+        aligned = df.reindex(full_index)
+        aligned.columns = [f"{name}_{col}" for col in aligned.columns]
+        aligned_dfs.append(aligned)
+
+    # Combine aligned dataframes
+    correlation_df = pd.concat(aligned_dfs, axis=1)
+
+    # Calculate correlation matrix
+    corr_matrix = pairwise_correlations(correlation_df).round(2)
+
+    rental_metrics_clean = rental_metrics.ffill()
+    gdp_growth_clean = gdp_growth.ffill()
+    cpi_quarterly_clean = cpi_quarterly.ffill()
+
+    # Rolling Correlations over the aligned, forward-filled quarters
+    window = 4
+    rolling_corr = rolling_correlations(correlation_df.ffill(), window, pairs=ROLLING_PAIRS.values())
+    rolling_corr.columns = list(ROLLING_PAIRS)
+
+    # Tourism indicators join the lead/lag scan as quarterly means
+    hotel_periods = parse_dates(hotel_data['Time Period'])
+    tourism = pd.DataFrame({
+        'Indicator': hotel_data['Hotel Indicator'].astype(str).to_numpy(),
+        'Value': pd.to_numeric(hotel_data['Value'], errors='coerce').to_numpy()
+    }, index=hotel_periods)[hotel_periods.notna()]
+    tourism = tourism.groupby([pd.Grouper(freq='QE'), 'Indicator'])['Value'].mean().unstack()
+    tourism.columns = [f"Tourism_{col}" for col in tourism.columns]
+    indicators = pd.concat([correlation_df, tourism.reindex(correlation_df.index)], axis=1)
+    lead_lag = lead_lag_correlations(indicators, lags=LEAD_LAGS, windows=LEAD_LAG_WINDOWS.values())
+
+    return {
+        'rental': rental_metrics_clean,
+        'gdp': gdp_growth_clean,
+        'cpi': cpi_quarterly_clean,
+        'population': population_clean,
+        'correlation_df': correlation_df,
+        'corr_matrix': corr_matrix,
+        'rolling_corr': rolling_corr,
+        'lead_lag': lead_lag,
+        'version': version
+    }
+
+@st.fragment
+def lead_lag_fragment(lead_lag, version):
+    """Heatmap of how strongly each indicator leads the chosen one, by lead time"""
+    followers = lead_lag['follower'].unique().tolist()
+    col_follower, col_window = st.columns(2)
+    with col_follower:
+        follower = st.selectbox(
+            'Indicator to explain',
+            followers,
+            index=followers.index('Rental_Average_Rent') if 'Rental_Average_Rent' in followers else 0,
+            help="Each row shows how the indicator correlates with this one that many quarters later"
         )
-        full_index = pd.date_range(start=start_date, end=end_date, freq='QE')
-
-        # Reindex all dataframes with common index
-        dfs = {
-            'Rental': rental_metrics,
-            'GDP': gdp_growth,
-            'CPI': cpi_quarterly,
-            'Population': population_clean
-        }
+    with col_window:
+        window = LEAD_LAG_WINDOWS[st.selectbox('Lookback', list(LEAD_LAG_WINDOWS))]
 
-        aligned_dfs = []
-        for name, df in dfs.items():
-            aligned = df.reindex(full_index)
-            aligned.columns = [f"{name}_{col}" for col in aligned.columns]
-            aligned_dfs.append(aligned)
+    st_echarts(chart("lead_lag_heatmap", lead_lag, follower, window, version=version), height="500px")
 
-        # Combine aligned dataframes
-        correlation_df = pd.concat(aligned_dfs, axis=1)
+    scan = lead_lag_slice(lead_lag, follower, window).dropna(subset=['correlation'])
+    if not scan.empty:
+        best = scan.loc[scan['correlation'].abs().idxmax()]
+        st.write(f"Strongest lead: {best['leader']} {best['lag']} quarters ahead "
+                 f"({best['correlation']:.2f} over {best['periods']} quarters)")
 
-        # Calculate correlation matrix
-        corr_matrix = correlation_df.corr().round(2)
+def correlation_tab():
+    try:
+        datasets = run_concurrently(
+            [(get_dataset, name) for name in ("rents", "gdp", "cpi", "population")]
+            + [(fetch_data, "hotel_establishments_main_indicators", HOTEL_COLUMNS)]
+        )
+        payload = correlation_payload(datasets, "|".join(str(frame.attrs.get("version")) for frame in datasets))
+        correlation_df = payload['correlation_df']
+        corr_matrix = payload['corr_matrix']
         
         st.markdown("### 📈 Time Series Analysis")
-        
-        rental_metrics_clean = rental_metrics.fillna(method='ffill')
-        gdp_growth_clean = gdp_growth.fillna(method='ffill')
-        cpi_quarterly_clean = cpi_quarterly.fillna(method='ffill')
-        population_clean = population_clean.fillna(method='ffill')
 
         # Price vs Economic Indicators
-        price_gdp_chart = {
-            "tooltip": {"trigger": "axis"},
-            "legend": {
-                "data": ["Average Rent", "GDP Growth", "CPI"]
-            },
-            "xAxis": {
-                "type": "category",
-                "data": rental_metrics_clean.index.strftime('%Y-%m').tolist()
-            },
-            "yAxis": [
-                {"type": "value", "name": "Average Rent (AED)", "position": "left"},
-                {"type": "value", "name": "Growth Rate (%)", "position": "right"}
-            ],
-            "series": [
-                {
-                    "name": "Average Rent",
-                    "type": "line",
-                    "data": prepare_chart_data(rental_metrics_clean['Average_Rent']),
-                    "smooth": True
-                },
-                {
-                    "name": "GDP Growth",
-                    "type": "line",
-                    "yAxisIndex": 1,
-                    "data": prepare_chart_data(gdp_growth_clean['GDP_Growth']),
-                    "smooth": True
-                },
-                {
-                    "name": "CPI",
-                    "type": "line",
-                    "yAxisIndex": 1,
-                    "data": prepare_chart_data(cpi_quarterly_clean['CPI']),
-                    "smooth": True
-                }
-            ],
-            "dataZoom": [{"type": "slider"}]
-        }
-        st_echarts(price_gdp_chart)
+        st_echarts(chart("price_gdp_chart", payload, version=payload['version']))
 
         # Volume vs Population
-        volume_pop_chart = {
-            "tooltip": {"trigger": "axis"},
-            "legend": {
-                "data": ["Transaction Volume", "Population"]
-            },
-            "xAxis": {
-                "type": "category",
-                "data": rental_metrics_clean.index.strftime('%Y-%m').tolist()
-            },
-            "yAxis": [
-                {"type": "value", "name": "Transactions"},
-                {"type": "value", "name": "Population"}
-            ],
-            "series": [
-                {
-                    "name": "Transaction Volume",
-                    "type": "bar",
-                    "data": prepare_chart_data(rental_metrics_clean['Transaction_Volume'])
-                },
-                {
-                    "name": "Population",
-                    "type": "line",
-                    "yAxisIndex": 1,
-                    "data": prepare_chart_data(population_clean['Population']),
-                    "smooth": True
-                }
-            ],
-            "dataZoom": [{"type": "slider"}]
-        }
-        st_echarts(volume_pop_chart)
-
-        # Rolling Correlations
-        window = 4
-        rolling_corr = pd.DataFrame({
-            'GDP': rental_metrics_clean['Average_Rent'].rolling(window).corr(gdp_growth_clean['GDP_Growth']),
-            'CPI': rental_metrics_clean['Average_Rent'].rolling(window).corr(cpi_quarterly_clean['CPI']),
-            'Population': rental_metrics_clean['Average_Rent'].rolling(window).corr(population_clean['Population'])
-        })
-
-        rolling_corr_chart = {
-            "tooltip": {"trigger": "axis"},
-            "legend": {"data": ["GDP", "CPI", "Population"]},
-            "xAxis": {
-                "type": "category",
-                "data": rolling_corr.index.strftime('%Y-%m').tolist()
-            },
-            "yAxis": {"type": "value", "name": "Correlation"},
-            "series": [
-                {
-                    "name": col,
-                    "type": "line",
-                    "data": prepare_chart_data(rolling_corr[col]),
-                    "smooth": True
-                } for col in rolling_corr.columns
-            ],
-            "dataZoom": [{"type": "slider"}]
-        }
-        st_echarts(rolling_corr_chart)
+        st_echarts(chart("volume_pop_chart", payload, version=payload['version']))
+
+        st_echarts(chart("rolling_corr_chart", payload, version=payload['version']))
         
+        st.markdown("### ⏱️ Lead/Lag Analysis")
+        lead_lag_fragment(payload['lead_lag'], payload['version'])
+
         col3, col4 = st.columns([2,1])
         
         with col3:
             st.markdown("<h4> 📊 Correlation Heatmap</h4>", unsafe_allow_html=True)
             
-            # Generate heatmap data with proper axis labels
-            heatmap_data = []
-            for i, row_var in enumerate(corr_matrix.index):
-                for j, col_var in enumerate(corr_matrix.columns):
-                    value = corr_matrix.loc[row_var, col_var]
-                    if not pd.isna(value):
-                        heatmap_data.append([j, i, float(value)])  # Note j comes first for x-axis
-
-            heatmap = {
-                "tooltip": {"trigger": "item"},
-                "visualMap": {
-                    "min": -1,
-                    "max": 1,
-                    "calculable": True,
-                    "orient": 'horizontal',
-                    "left": 'center',
-                    "bottom": '12%',
-                    "inRange": {"color": ['#313695', '#4575b4', '#74add1', '#abd9e9', '#ffffbf', '#fee090', '#fdae61', '#f46d43', '#d73027', '#a50026']}
-                },
-                "xAxis": {
-                    "type": "category",
-                    "data": corr_matrix.columns.tolist(),
-                    "axisLabel": {
-                        "rotate": 45,
-                        "interval": 0,
-                        "fontSize": 10
-                    }
-                },
-                "yAxis": {
-                    "type": "category",
-                    "data": corr_matrix.index.tolist(),
-                    "axisLabel": {
-                        "rotate": 0,
-                        "fontSize": 10
-                    }
-                },
-                "series": [{
-                    "type": "heatmap",
-                    "data": heatmap_data,
-                    "label": {"show": True, "fontSize": 10},
-                    "emphasis": {"itemStyle": {"shadowBlur": 10, "shadowColor": 'rgba(0,0,0,0.5)'}}
-                }],
-                "grid": {
-                    "top": "15%",
-                    "bottom": "25%",
-                    "left": "20%",
-                    "right": "5%"
-                }
-            }
-            
-            st_echarts(heatmap, height="600px")
+            st_echarts(chart("correlation_heatmap", payload, version=payload['version']), height="600px")
             
             
         with col4:
@@ -1189,19 +900,24 @@ def correlation_tab():
         st.write("Please check data integrity and time period alignment")
 
 
+# Sections in display order; only the selected one is computed on each run
+SECTIONS = {
+    "🏘️ Market Overview": market_overview_tab,
+    "🌍 Macroeconomic Factors": macroeconomic_tab,
+    "⫻ Correlation": correlation_tab,
+    "💡 Investment Insights": investment_tab
+}
+
 def render_view():
-    # Create tabs
-    st.subheader("🏘️ Market Overview")
-    market_overview_tab()
-    
-    st.subheader("🌍 Macroeconomic Factors")
-    macroeconomic_tab()
-    
-    st.subheader("⫻ Correlation")
-    correlation_tab()
-    
-    st.subheader("💡 Investment Insights")
-    investment_tab()
+    section = st.radio(
+        "Section",
+        list(SECTIONS),
+        horizontal=True,
+        label_visibility="collapsed",
+        key="analysis_section"
+    )
+    st.subheader(section)
+    SECTIONS[section]()
     
 if __name__ == "__main__":
     config()
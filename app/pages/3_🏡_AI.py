@@ -7,8 +7,6 @@ import os
 import pymongo
 import certifi
 
-import requests
-from requests.structures import CaseInsensitiveDict
 import joblib
 import pandas as pd
 
@@ -54,17 +52,7 @@ def config():
     """, unsafe_allow_html=True)
 
 def render_property_predictor():
-    
-    
     """Render property prediction interface"""
-    
-    url = "https://api.geoapify.com/v1/geocode/search?text=38%20Upper%20Montagu%20Street%2C%20Westminster%20W1H%201LJ%2C%20United%20Kingdom&apiKey=" + GEOAPIFY
-
-    headers = CaseInsensitiveDict()
-    headers["Accept"] = "application/json"
-
-    resp = requests.get(url, headers=headers)
-
     # Create tabs for different prediction types
     tab1, tab2 = st.tabs(["🎯 Basic Prediction", "🎲 Advanced Prediction"])
     
@@ -0,0 +1,94 @@
+import pyarrow as pa
+import pyarrow.compute as pc
+from pymongoarrow.api import Schema, aggregate_arrow_all
+
+
+# Explicit column types for the large collections. Documents are decoded from
+# raw BSON batches straight into Arrow buffers of these types, so no
+# per-document dicts are built on the Python side. The typed decoder cannot
+# read numeric strings or decimals into a float64 column, so the server splits
+# each float column into its numbers and a text copy of everything else, and
+# the two are merged back untyped for datasets.normalize to convert.
+NUMBER_TYPES = ["double", "int", "long"]
+COLLECTION_SCHEMAS = {
+    "rents_quarterly": {
+        "Quarter": pa.string(),
+        "Contract Amount": pa.float64(),
+        "Property Size (sq.m)": pa.float64(),
+        "Area": pa.string(),
+        "Property Type": pa.string(),
+        "Property Sub Type": pa.string(),
+        "Usage": pa.string(),
+        "Latitude": pa.float64(),
+        "Longitude": pa.float64(),
+        "Nearest Metro": pa.string(),
+        "Nearest Mall": pa.string(),
+        "Nearest Landmark": pa.string()
+    },
+    "transactions_df_quarterly_data": {
+        "Quarter": pa.string(),
+        "Amount": pa.float64(),
+        "Transaction Size (sq.m)": pa.float64()
+    }
+}
+
+
+def supports(collection_name, columns):
+    """Whether the bulk loader has a schema covering the requested columns"""
+    schema = COLLECTION_SCHEMAS.get(collection_name)
+    if schema is None or columns is None:
+        return False
+    return all(col in schema for col in columns)
+
+
+def decode_stage(schema, columns):
+    """$project stage reading each column under a positional name, float columns split in two.
+
+    Column names may contain dots (e.g. "sq.m"), which $project and field
+    paths would read as nesting, so values are read with $getField.
+    """
+    stage, fields = {"_id": 0}, {}
+    for i, col in enumerate(columns):
+        value = {"$getField": col}
+        if schema[col] == pa.float64():
+            is_number = {"$in": [{"$type": value}, NUMBER_TYPES]}
+            text = {"$convert": {"input": value, "to": "string", "onError": None, "onNull": None}}
+            stage[f"n{i}"] = {"$cond": [is_number, value, None]}
+            stage[f"t{i}"] = {"$cond": [is_number, None, text]}
+            fields[f"n{i}"], fields[f"t{i}"] = pa.float64(), pa.string()
+        else:
+            stage[f"c{i}"] = value
+            fields[f"c{i}"] = schema[col]
+    return stage, fields
+
+
+def load_table(collection, columns, query=None):
+    """Decode the projected columns of matching documents into an Arrow table.
+
+    Float columns come with a "<column> text" companion holding the values
+    stored as anything but a number, null elsewhere.
+    """
+    schema = COLLECTION_SCHEMAS[collection.name]
+    stage, fields = decode_stage(schema, columns)
+    table = aggregate_arrow_all(collection, [{"$match": query or {}}, {"$project": stage}], schema=Schema(fields))
+    names = {f"c{i}": col for i, col in enumerate(columns)}
+    names.update({f"n{i}": col for i, col in enumerate(columns)})
+    names.update({f"t{i}": f"{col} text" for i, col in enumerate(columns)})
+    return table.rename_columns([names[name] for name in table.column_names])
+
+
+def load_frame(collection, columns, query=None):
+    """Bulk-load the projected columns of matching documents as a DataFrame.
+
+    A float column that holds text values (numeric strings, decimals) is
+    returned untyped, numbers as floats and the rest as their text, as the
+    dict path would load it; otherwise it stays float64.
+    """
+    table = load_table(collection, columns, query)
+    frame = table.select(list(columns)).to_pandas()
+    for col in columns:
+        text = f"{col} text"
+        if text in table.column_names and pc.any(pc.is_valid(table[text])).as_py():
+            raw = table[text].to_pandas()
+            frame[col] = frame[col].astype(object).where(raw.isna(), raw)
+    return frame
@@ -0,0 +1,367 @@
+import numpy as np
+import pandas as pd
+
+from pages.utils.correlation import lead_lag_slice
+from pages.utils.downsample import level_of_detail, stratified_sample
+from pages.utils.timeparse import parse_quarters
+
+
+# ECharts option builders for the Analysis page. Each builder is a pure
+# function of its data and widget state, so the page can build an option once
+# per (dataset version, widget state) and reuse it on every rerun instead of
+# re-deriving and re-listing the series.
+MARK_EXTREMES = {"data": [{"type": "max", "name": "Maximum"}, {"type": "min", "name": "Minimum"}]}
+HEATMAP_COLORS = ['#313695', '#4575b4', '#74add1', '#abd9e9', '#ffffbf', '#fee090', '#fdae61', '#f46d43', '#d73027', '#a50026']
+
+
+def series_values(values):
+    """Floats for a chart series with missing values as None"""
+    values = pd.Series(np.asarray(values, dtype=float))
+    return values.astype(object).where(values.notna(), None).tolist()
+
+
+def quarter_labels(quarters):
+    """"2023-Q3" style axis labels"""
+    return quarters.dt.strftime('%Y-Q%q').tolist()
+
+
+def hotel_chart(hotel_indicators):
+    hotel_estab_data = hotel_indicators.pivot(index='Time Period', columns='Hotel Indicator', values='Value').reset_index()
+    return {
+        "tooltip": {"trigger": "axis"},
+        "legend": {"data": ["Hotel Establishments", "Rooms"]},
+        "xAxis": {"type": "category", "data": hotel_estab_data['Time Period'].tolist()},
+        "yAxis": [
+            {"type": "value", "name": "Hotel Establishments"},
+            {"type": "value", "name": "Rooms"}
+        ],
+        "series": [
+            {"name": "Hotel Establishments", "data": hotel_estab_data['Hotel Establishments'].tolist(), "type": "line", "smooth": True},
+            {"name": "Rooms", "data": hotel_estab_data['Rooms'].tolist(), "type": "line", "smooth": True, "yAxisIndex": 1}
+        ],
+        "dataZoom": [{"type": "slider"}]
+    }
+
+
+def guest_chart(guests_data):
+    guest_hotels = guests_data[guests_data['Hotel Indicator'] == 'Guests - Hotels'].sort_values('Time Period')
+    guest_nights = guests_data[guests_data['Hotel Indicator'] == 'Guest Nights'].sort_values('Time Period')
+    return {
+        "tooltip": {"trigger": "axis"},
+        "legend": {"data": ["Guest Nights", "Hotel Guests"]},
+        "xAxis": {"type": "category", "data": guest_nights['Time Period'].tolist()},
+        "yAxis": {"type": "value"},
+        "series": [
+            {"name": "Guest Nights", "data": guest_nights['Value'].tolist(), "type": "bar"},
+            {"name": "Hotel Guests", "data": guest_hotels['Value'].tolist(), "type": "bar"}
+        ],
+        "dataZoom": [{"type": "slider"}]
+    }
+
+
+def revenue_chart(revenue_data):
+    guest_nights = revenue_data[revenue_data['Hotel Indicator'] == 'Guest Nights'].sort_values('Time Period')
+    room_revenue = revenue_data[revenue_data['Hotel Indicator'] == 'Room Revenue'].sort_values('Time Period')
+
+    # Align the two indicators on shared time periods
+    merged_data = pd.merge(
+        guest_nights[['Time Period', 'Value']].rename(columns={'Value': 'Guest Nights'}),
+        room_revenue[['Time Period', 'Value']].rename(columns={'Value': 'Room Revenue'}),
+        on='Time Period',
+        how='inner'
+    )
+    return {
+        "tooltip": {"trigger": "axis"},
+        "legend": {"data": ["Guest Nights", "Room Revenue"]},
+        "xAxis": {"type": "category", "data": merged_data['Time Period'].tolist()},
+        "yAxis": [
+            {"type": "value", "name": "Guest Nights"},
+            {"type": "value", "name": "Room Revenue (AED)"}
+        ],
+        "series": [
+            {"name": "Guest Nights", "data": merged_data['Guest Nights'].tolist(), "type": "line", "smooth": True},
+            {"name": "Room Revenue", "data": merged_data['Room Revenue'].tolist(), "type": "line", "smooth": True, "yAxisIndex": 1}
+        ],
+        "dataZoom": [{"type": "slider"}]
+    }
+
+
+def rental_trend_chart(quarterly_rentals):
+    quarterly_rentals = quarterly_rentals.assign(Quarter=parse_quarters(quarterly_rentals['Quarter'])).sort_values('Quarter')
+    return {
+        "tooltip": {"trigger": "axis"},
+        "legend": {"data": ["Average Rent", "Number of Contracts"]},
+        "xAxis": {"type": "category", "data": quarter_labels(quarterly_rentals['Quarter']), "axisLabel": {"rotate": 45}},
+        "yAxis": [
+            {"type": "value", "name": "Average Rent (AED)"},
+            {"type": "value", "name": "Number of Contracts"}
+        ],
+        "series": [
+            {"name": "Average Rent", "data": quarterly_rentals['mean'].round(2).tolist(), "type": "line", "smooth": True},
+            {"name": "Number of Contracts", "data": quarterly_rentals['count'].tolist(), "type": "bar", "yAxisIndex": 1}
+        ],
+        "dataZoom": [{"type": "slider"}],
+        "grid": {"bottom": "15%"}
+    }
+
+
+def property_pie(property_dist):
+    return {
+        "tooltip": {"trigger": "item"},
+        "legend": {"orient": "horizontal", "bottom": "bottom"},
+        "series": [{
+            "type": "pie",
+            "data": [{"value": v, "name": k} for k, v in zip(property_dist['Property Type'], property_dist['count'])],
+            "radius": "50%"
+        }]
+    }
+
+
+def area_bar(area_rent):
+    return {
+        "tooltip": {"trigger": "axis"},
+        "xAxis": {"type": "category", "data": area_rent['Area'].tolist(), "axisLabel": {"rotate": 45}},
+        "yAxis": {"type": "value"},
+        "series": [{"data": area_rent['mean'].round(2).tolist(), "type": "bar", "name": "Average Rent"}]
+    }
+
+
+def transactions_chart(transactions_data):
+    transactions_data = transactions_data.sort_values('Quarter')
+    return {
+        "tooltip": {"trigger": "axis"},
+        "legend": {"data": ["Transaction Amount", "Transaction Size"]},
+        "xAxis": {"type": "category", "data": quarter_labels(transactions_data['Quarter']), "axisLabel": {"rotate": 45}},
+        "yAxis": [
+            {"type": "value", "name": "Amount (AED)"},
+            {"type": "value", "name": "Size (sq.m)"}
+        ],
+        "series": [
+            {"name": "Transaction Amount", "type": "line", "data": transactions_data['Amount'].tolist(), "smooth": True},
+            {"name": "Transaction Size", "type": "line", "yAxisIndex": 1, "data": transactions_data['Transaction Size (sq.m)'].tolist(), "smooth": True}
+        ],
+        "dataZoom": [{"type": "slider"}],
+        "grid": {"bottom": "15%"}
+    }
+
+
+def scatter_chart(transactions_data, max_points):
+    # Stratified sample keeps the scatter bounded however many transactions there are
+    sizes = transactions_data['Transaction Size (sq.m)'].to_numpy(dtype=float)
+    amounts = transactions_data['Amount'].to_numpy(dtype=float)
+    sample = stratified_sample(sizes, amounts, max_points)
+    return {
+        "tooltip": {"trigger": "item"},
+        "xAxis": {"type": "value", "name": "Transaction Size (sq.m)"},
+        "yAxis": {"type": "value", "name": "Amount (AED)"},
+        "series": [{"type": "scatter", "data": np.column_stack([sizes[sample], amounts[sample]]).tolist(), "symbolSize": 10}]
+    }
+
+
+def exchange_chart(aed_to_usd, window, max_points):
+    """Exchange-rate option plus the plotted indices, detailed inside the zoom `window`"""
+    aed_to_usd = aed_to_usd.sort_values('Date')
+    closes = aed_to_usd['Close'].to_numpy(dtype=float)
+    dates = aed_to_usd['Date'].astype(str).to_numpy()
+    indices, (zoom_start, zoom_end) = level_of_detail(closes, window, max_points)
+    option = {
+        "tooltip": {"trigger": "axis"},
+        "xAxis": {"type": "category", "data": dates[indices].tolist()},
+        "yAxis": {
+            "type": "value",
+            "name": "Exchange Rate",
+            "min": aed_to_usd['Close'].min() * 0.99,  # Set min slightly below lowest value
+            "max": aed_to_usd['Close'].max() * 1.01   # Set max slightly above highest value
+        },
+        "series": [{
+            "data": closes[indices].tolist(),
+            "type": "line",
+            "smooth": True,
+            "name": "AED to USD",
+            "lineStyle": {"width": 2},
+            "markPoint": MARK_EXTREMES
+        }],
+        "dataZoom": [{"type": "slider", "start": zoom_start, "end": zoom_end}]
+    }
+    return option, indices
+
+
+def gdp_chart(gdp_measures, selected_measures):
+    return {
+        "tooltip": {"trigger": "axis"},
+        "xAxis": {"type": "category", "data": gdp_measures.index.astype(str).tolist()},
+        "yAxis": {"type": "value", "name": "Growth Rate (%)"},
+        "series": [
+            {"name": measure, "data": gdp_measures[measure].tolist(), "type": "line", "smooth": True}
+            for measure in selected_measures
+        ],
+        "dataZoom": [{"type": "slider"}]
+    }
+
+
+def population_chart(population_data):
+    population_data = population_data.sort_values('Time_Period')
+    return {
+        "tooltip": {"trigger": "axis"},
+        "legend": {"data": ["Population Indicators"]},
+        "xAxis": {"type": "category", "data": population_data['Time_Period'].astype(str).tolist()},
+        "yAxis": {"type": "value", "name": "Value"},
+        "series": [{
+            "name": "Population Indicators",
+            "data": population_data['Value'].tolist(),
+            "type": "line",
+            "smooth": True,
+            "markPoint": {"data": [{"type": "max", "name": "Max"}, {"type": "min", "name": "Min"}]}
+        }],
+        "dataZoom": [{"type": "slider"}]
+    }
+
+
+def cpi_chart(cpi_pivot, selected_divisions):
+    return {
+        "tooltip": {"trigger": "axis"},
+        "xAxis": {"type": "category", "data": cpi_pivot['Time Period'].tolist()},
+        "yAxis": {"type": "value", "name": "CPI Value"},
+        "series": [
+            {"name": division, "type": "line", "smooth": True, "data": series_values(cpi_pivot[division])}
+            for division in selected_divisions
+        ],
+        "dataZoom": [{"type": "slider"}]
+    }
+
+
+def indicator_chart(wdi_data, selected_indicator):
+    year_columns = [str(year) for year in range(1960, 2024) if str(year) in wdi_data.columns]
+    indicator_data = wdi_data[wdi_data['Indicator Name'] == selected_indicator]
+    return {
+        "tooltip": {"trigger": "axis"},
+        "xAxis": {"type": "category", "data": year_columns},
+        "yAxis": {"type": "value", "name": selected_indicator},
+        "series": [{
+            "name": selected_indicator,
+            "type": "line",
+            "data": [indicator_data[year].iloc[0] for year in year_columns],
+            "smooth": True,
+            "markPoint": MARK_EXTREMES
+        }],
+        "dataZoom": [{"type": "slider"}]
+    }
+
+
+def price_gdp_chart(payload):
+    rental, gdp, cpi = payload['rental'], payload['gdp'], payload['cpi']
+    return {
+        "tooltip": {"trigger": "axis"},
+        "legend": {"data": ["Average Rent", "GDP Growth", "CPI"]},
+        "xAxis": {"type": "category", "data": rental.index.strftime('%Y-%m').tolist()},
+        "yAxis": [
+            {"type": "value", "name": "Average Rent (AED)", "position": "left"},
+            {"type": "value", "name": "Growth Rate (%)", "position": "right"}
+        ],
+        "series": [
+            {"name": "Average Rent", "type": "line", "data": series_values(rental['Average_Rent']), "smooth": True},
+            {"name": "GDP Growth", "type": "line", "yAxisIndex": 1, "data": series_values(gdp['GDP_Growth']), "smooth": True},
+            {"name": "CPI", "type": "line", "yAxisIndex": 1, "data": series_values(cpi['CPI']), "smooth": True}
+        ],
+        "dataZoom": [{"type": "slider"}]
+    }
+
+
+def volume_pop_chart(payload):
+    rental, population = payload['rental'], payload['population']
+    return {
+        "tooltip": {"trigger": "axis"},
+        "legend": {"data": ["Transaction Volume", "Population"]},
+        "xAxis": {"type": "category", "data": rental.index.strftime('%Y-%m').tolist()},
+        "yAxis": [
+            {"type": "value", "name": "Transactions"},
+            {"type": "value", "name": "Population"}
+        ],
+        "series": [
+            {"name": "Transaction Volume", "type": "bar", "data": series_values(rental['Transaction_Volume'])},
+            {"name": "Population", "type": "line", "yAxisIndex": 1, "data": series_values(population['Population']), "smooth": True}
+        ],
+        "dataZoom": [{"type": "slider"}]
+    }
+
+
+def rolling_corr_chart(payload):
+    rolling_corr = payload['rolling_corr']
+    return {
+        "tooltip": {"trigger": "axis"},
+        "legend": {"data": rolling_corr.columns.tolist()},
+        "xAxis": {"type": "category", "data": rolling_corr.index.strftime('%Y-%m').tolist()},
+        "yAxis": {"type": "value", "name": "Correlation"},
+        "series": [
+            {"name": col, "type": "line", "data": series_values(rolling_corr[col]), "smooth": True}
+            for col in rolling_corr.columns
+        ],
+        "dataZoom": [{"type": "slider"}]
+    }
+
+
+def correlation_heatmap(payload):
+    corr_matrix = payload['corr_matrix']
+    # [x, y, value] cells for every defined correlation
+    values = corr_matrix.to_numpy(dtype=float)
+    rows, cols = np.nonzero(~np.isnan(values))
+    heatmap_data = [[x, y, value] for x, y, value in zip(cols.tolist(), rows.tolist(), values[rows, cols].tolist())]
+    return {
+        "tooltip": {"trigger": "item"},
+        "visualMap": {
+            "min": -1,
+            "max": 1,
+            "calculable": True,
+            "orient": 'horizontal',
+            "left": 'center',
+            "bottom": '12%',
+            "inRange": {"color": HEATMAP_COLORS}
+        },
+        "xAxis": {"type": "category", "data": corr_matrix.columns.tolist(), "axisLabel": {"rotate": 45, "interval": 0, "fontSize": 10}},
+        "yAxis": {"type": "category", "data": corr_matrix.index.tolist(), "axisLabel": {"rotate": 0, "fontSize": 10}},
+        "series": [{
+            "type": "heatmap",
+            "data": heatmap_data,
+            "label": {"show": True, "fontSize": 10},
+            "emphasis": {"itemStyle": {"shadowBlur": 10, "shadowColor": 'rgba(0,0,0,0.5)'}}
+        }],
+        "grid": {"top": "15%", "bottom": "25%", "left": "20%", "right": "5%"}
+    }
+
+
+def lead_lag_heatmap(lead_lag, follower, window):
+    grid = lead_lag_slice(lead_lag, follower, window).pivot(index="leader", columns="lag", values="correlation").round(2)
+    values = grid.to_numpy(dtype=float)
+    rows, cols = np.nonzero(~np.isnan(values))
+    heatmap_data = [[x, y, value] for x, y, value in zip(cols.tolist(), rows.tolist(), values[rows, cols].tolist())]
+    return {
+        "tooltip": {"trigger": "item"},
+        "visualMap": {
+            "min": -1,
+            "max": 1,
+            "calculable": True,
+            "orient": 'horizontal',
+            "left": 'center',
+            "bottom": '5%',
+            "inRange": {"color": HEATMAP_COLORS}
+        },
+        "xAxis": {"type": "category", "name": "Lead (quarters)", "data": [f"{lag}Q" for lag in grid.columns]},
+        "yAxis": {"type": "category", "data": grid.index.tolist(), "axisLabel": {"fontSize": 10}},
+        "series": [{
+            "type": "heatmap",
+            "data": heatmap_data,
+            "label": {"show": True, "fontSize": 10},
+            "emphasis": {"itemStyle": {"shadowBlur": 10, "shadowColor": 'rgba(0,0,0,0.5)'}}
+        }],
+        "grid": {"top": "5%", "bottom": "25%", "left": "25%", "right": "5%"}
+    }
+
+
+BUILDERS = {
+    builder.__name__: builder for builder in (
+        hotel_chart, guest_chart, revenue_chart, rental_trend_chart, property_pie, area_bar,
+        transactions_chart, scatter_chart, exchange_chart, gdp_chart, population_chart,
+        cpi_chart, indicator_chart, price_gdp_chart, volume_pop_chart, rolling_corr_chart,
+        correlation_heatmap, lead_lag_heatmap
+    )
+}
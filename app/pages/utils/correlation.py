@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+
+
+# Correlation engine for aligned indicator frames (one column per indicator,
+# one row per period). Every pair is handled at once from masked moment sums:
+# the full matrix from a few matrix products, rolling windows from cumulative
+# sums, so cost grows with the number of pairs, not with Python loops over
+# them. Missing values follow pandas: each pair uses the rows where both of
+# its indicators are present.
+
+
+def _centered(frame):
+    """Float values centred on their column means (limits cancellation in the sums) and the presence mask"""
+    values = frame.to_numpy(dtype=float)
+    present = ~np.isnan(values)
+    # All-missing columns are centred on 0 rather than warning
+    means = np.nanmean(np.where(present.any(axis=0), values, 0.0), axis=0)
+    return np.where(present, values - means, 0.0), present
+
+
+def _correlation(n, sx, sy, sxx, syy, sxy, min_periods):
+    """Pearson correlation from sums over the rows shared by each pair"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        corr = cov / np.sqrt(var_x * var_y)
+    corr[(n < max(min_periods, 2)) | ~(var_x > 0) | ~(var_y > 0)] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def pairwise_correlations(frame, min_periods=1):
+    """Correlation matrix over pairwise-complete rows, like DataFrame.corr()"""
+    values, present = _centered(frame)
+    mask = present.astype(float)
+    n = mask.T @ mask
+    sx = values.T @ mask          # sx[i, j]: sum of column i over rows where i and j are present
+    sxx = (values ** 2).T @ mask
+    sxy = values.T @ values
+    corr = _correlation(n, sx, sx.T, sxx, sxx.T, sxy, min_periods)
+    return pd.DataFrame(corr, index=frame.columns, columns=frame.columns)
+
+
+def indicator_pairs(columns):
+    """Every unordered pair of distinct columns"""
+    left, right = np.triu_indices(len(columns), k=1)
+    return [(columns[i], columns[j]) for i, j in zip(left, right)]
+
+
+def rolling_correlations(frame, window, pairs=None, min_periods=None):
+    """Rolling-window correlation of every pair, like Series.rolling(window).corr(other).
+
+    Returns one column per (left, right) pair, all pairs by default. A window
+    needs `min_periods` (default `window`) rows where both series are present.
+    """
+    pairs = indicator_pairs(list(frame.columns)) if pairs is None else list(pairs)
+    min_periods = window if min_periods is None else min_periods
+    position = {name: i for i, name in enumerate(frame.columns)}
+    left = np.array([position[a] for a, _ in pairs], dtype=np.int64)
+    right = np.array([position[b] for _, b in pairs], dtype=np.int64)
+
+    values, present = _centered(frame)
+    both = present[:, left] & present[:, right]
+    x = np.where(both, values[:, left], 0.0)
+    y = np.where(both, values[:, right], 0.0)
+
+    # Window sums of every moment for every pair from one cumulative sum
+    moments = np.stack([both.astype(float), x, y, x * x, y * y, x * y])
+    totals = np.concatenate([np.zeros((6, 1, len(pairs))), np.cumsum(moments, axis=1)], axis=1)
+    window_sums = totals[:, window:] - totals[:, :-window] if len(frame) >= window else totals[:, :0]
+
+    result = np.full((len(frame), len(pairs)), np.nan)
+    if len(window_sums[0]):
+        result[window - 1:] = _correlation(*window_sums, min_periods)
+    columns = pd.MultiIndex.from_tuples(pairs, names=["left", "right"])
+    return pd.DataFrame(result, index=frame.index, columns=columns)
+
+
+def lead_lag_correlations(frame, lags=range(1, 9), windows=(None,), min_periods=4):
+    """Correlation of each follower with each leader shifted `lag` periods earlier.
+
+    Scans every (window, lag, leader, follower) combination in one batched
+    product. A window of w uses the last w periods of the follower; None uses
+    the whole history. Returns one row per combination with its correlation
+    and the number of overlapping periods.
+    """
+    lags, windows = list(lags), list(windows)
+    values, present = _centered(frame)
+    n_rows = len(frame)
+
+    # Leaders shifted down by each lag, padded with missing rows
+    leaders = np.zeros((len(lags),) + values.shape)
+    leader_present = np.zeros((len(lags),) + values.shape)
+    for i, lag in enumerate(lags):
+        if lag < n_rows:
+            leaders[i, lag:] = values[:n_rows - lag]
+            leader_present[i, lag:] = present[:n_rows - lag]
+
+    # Rows each window covers, counted back from the latest period
+    weights = np.zeros((len(windows), n_rows))
+    for i, window in enumerate(windows):
+        weights[i, max(n_rows - (window or n_rows), 0):] = 1.0
+
+    follower_present = present.astype(float)
+    sums = {
+        name: np.einsum("wt,lti,tj->wlij", weights, x, y, optimize=True)
+        for name, (x, y) in {
+            "n": (leader_present, follower_present),
+            "sx": (leaders, follower_present),
+            "sy": (leader_present, values),
+            "sxx": (leaders ** 2, follower_present),
+            "syy": (leader_present, values ** 2),
+            "sxy": (leaders, values)
+        }.items()
+    }
+    corr = _correlation(sums["n"], sums["sx"], sums["sy"], sums["sxx"], sums["syy"], sums["sxy"], min_periods)
+
+    window_idx, lag_idx, leader_idx, follower_idx = np.indices(corr.shape).reshape(4, -1)
+    columns = np.asarray(frame.columns, dtype=object)
+    return pd.DataFrame({
+        "window": np.asarray(windows, dtype=object)[window_idx],
+        "lag": np.asarray(lags)[lag_idx],
+        "leader": columns[leader_idx],
+        "follower": columns[follower_idx],
+        "correlation": corr.ravel(),
+        "periods": sums["n"].ravel().astype(np.int64)
+    })
+
+
+def lead_lag_slice(lead_lag, follower, window):
+    """Scan rows for one follower and window, leaders other than the follower itself"""
+    in_window = lead_lag["window"].isna() if window is None else lead_lag["window"] == window
+    return lead_lag[in_window & (lead_lag["follower"] == follower) & (lead_lag["leader"] != follower)]
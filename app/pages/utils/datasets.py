@@ -0,0 +1,88 @@
+import pandas as pd
+
+from pages.utils.timeparse import parse_quarters, parse_dates, quarters_from_fields
+
+
+# Collections shared between Analysis tabs. Each is loaded once with the union
+# of the columns the tabs read, and its dtypes are normalized at load time so
+# the tabs never re-run numeric or quarter conversions themselves. Every
+# dataset is also indexed by period start and sorted, so consumers resample
+# and summarise by quarter straight from the index.
+TIME_INDEX = "period_start"
+DATASETS = {
+    "rents": {
+        "collection": "rents_quarterly",
+        "columns": (
+            "Quarter", "Contract Amount", "Area", "Property Type", "Property Sub Type", "Usage",
+            "Latitude", "Longitude", "Nearest Metro", "Nearest Mall", "Nearest Landmark"
+        ),
+        "numeric": ("Contract Amount", "Latitude", "Longitude"),
+        "categorical": (
+            "Area", "Property Type", "Property Sub Type", "Usage",
+            "Nearest Metro", "Nearest Mall", "Nearest Landmark"
+        ),
+        "quarter": "Quarter",
+        "time": ("period", "Quarter")
+    },
+    "transactions": {
+        "collection": "transactions_df_quarterly_data",
+        "columns": ("Quarter", "Amount", "Transaction Size (sq.m)"),
+        "numeric": ("Amount", "Transaction Size (sq.m)"),
+        "categorical": (),
+        "quarter": "Quarter",
+        "time": ("period", "Quarter")
+    },
+    "gdp": {
+        "collection": "gdp_quarterly_current_prices_df",
+        "columns": ("Time Period", "Quarter", "Measure", "Value"),
+        "numeric": ("Value",),
+        "categorical": (),
+        "quarter": None,
+        "time": ("fields", "Time Period", "Quarter")
+    },
+    "cpi": {
+        "collection": "consumer_price_index_monthly_df",
+        "columns": ("Time Period", "CPI Division", "Value"),
+        "numeric": ("Value",),
+        "categorical": (),
+        "quarter": None,
+        "time": ("dates", "Time Period")
+    },
+    "population": {
+        "collection": "population_indicators_df",
+        "columns": ("Time_Period", "Value"),
+        "numeric": ("Value",),
+        "categorical": (),
+        "quarter": None,
+        "time": ("dates", "Time_Period")
+    }
+}
+
+
+def time_index(frame, spec):
+    """Period start of every row, from a parsed quarter, a date column or year and quarter fields"""
+    kind, *cols = spec["time"]
+    if kind == "period":
+        return pd.DatetimeIndex(frame[cols[0]].dt.start_time)
+    if kind == "dates":
+        return parse_dates(frame[cols[0]])
+    return quarters_from_fields(frame[cols[0]], frame[cols[1]]).to_timestamp(how="start")
+
+
+def normalize(frame, spec):
+    """Apply a dataset's dtypes and sort it on its period-start index.
+
+    Numeric columns may arrive untyped, numbers mixed with numeric strings, and
+    are converted here. Rows without a usable period are dropped, since every
+    consumer filters or groups by time.
+    """
+    frame = frame.copy()
+    for col in spec["numeric"]:
+        frame[col] = pd.to_numeric(frame[col], errors="coerce")
+    for col in spec["categorical"]:
+        frame[col] = frame[col].astype("category")
+    if spec["quarter"]:
+        col = spec["quarter"]
+        frame[col] = pd.Series(parse_quarters(frame[col]), index=frame.index)
+    frame.index = time_index(frame, spec).rename(TIME_INDEX)
+    return frame[frame.index.notna()].sort_index(kind="stable")
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+
+# Square-grid aggregation of rental locations. Points are binned once per
+# dataset version at a few resolutions, so the density layer ships one row per
+# occupied cell instead of one per rental contract.
+GRID_LEVELS = {
+    "City (~11 km cells)": 0.1,
+    "District (~2 km cells)": 0.02,
+    "Block (~500 m cells)": 0.005
+}
+
+
+def cell_index(points, cell_size):
+    """(row, col) of the square cell holding each point"""
+    row = np.floor(points["Latitude"].to_numpy(dtype=float) / cell_size).astype(np.int64)
+    col = np.floor(points["Longitude"].to_numpy(dtype=float) / cell_size).astype(np.int64)
+    return row, col
+
+
+def density_grid(rental_data, cell_size):
+    """Count and mean contract amount per square cell, keyed by cell centre"""
+    points = rental_data.dropna(subset=["Latitude", "Longitude"])
+    row, col = cell_index(points, cell_size)
+    grid = pd.DataFrame({
+        "row": row,
+        "col": col,
+        "amount": pd.to_numeric(points["Contract Amount"], errors="coerce").to_numpy()
+    }).groupby(["row", "col"], sort=False)["amount"].agg(count="size", mean_amount="mean").reset_index()
+    grid["Latitude"] = (grid["row"] + 0.5) * cell_size
+    grid["Longitude"] = (grid["col"] + 0.5) * cell_size
+    return grid[["Latitude", "Longitude", "count", "mean_amount"]]
+
+
+def density_grids(rental_data, levels=GRID_LEVELS):
+    """Density grids for every configured resolution"""
+    return {name: density_grid(rental_data, size) for name, size in levels.items()}
+
+
+def heat_rows(grid):
+    """[lat, lon, weight] rows with weights scaled to the busiest cell"""
+    if grid.empty:
+        return []
+    weight = grid["count"] / grid["count"].max()
+    return np.column_stack([grid["Latitude"], grid["Longitude"], weight]).tolist()
+
+
+def cell_features(grid, cell_size):
+    """GeoJSON rectangles for each cell with its count and mean rent"""
+    half = cell_size / 2
+    features = []
+    for i, (lat, lon, count, mean_amount) in enumerate(grid.itertuples(index=False)):
+        features.append({
+            "type": "Feature",
+            # folium keys its generated styler on the id; without one it picks a property name, which may not be a JS identifier
+            "id": str(i),
+            "geometry": {
+                "type": "Polygon",
+                "coordinates": [[
+                    [lon - half, lat - half], [lon + half, lat - half],
+                    [lon + half, lat + half], [lon - half, lat + half],
+                    [lon - half, lat - half]
+                ]]
+            },
+            "properties": {
+                "Contracts": int(count),
+                "Mean rent (AED)": "n/a" if pd.isna(mean_amount) else f"{mean_amount:,.0f}"
+            }
+        })
+    return {"type": "FeatureCollection", "features": features}
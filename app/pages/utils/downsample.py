@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+
+# Chart-data reduction. Every function returns positional indices into the
+# input so callers can slice labels and values together, and every output is
+# bounded by the requested point budget regardless of input size.
+
+
+def lttb_indices(y, threshold):
+    """Largest-Triangle-Three-Buckets selection of `threshold` points from a line"""
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.arange(n, dtype=float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        next_start = edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = np.nanmean(y[next_start:next_end]) if np.isfinite(y[next_start:next_end]).any() else y[a]
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        selected[i + 1] = a
+    return np.unique(selected)
+
+
+def stratified_sample(x, y, max_points, bins=50, seed=0):
+    """Indices of at most `max_points` finite points, spread evenly over a bins x bins grid.
+
+    Each occupied cell keeps up to the same quota of randomly chosen points,
+    so sparse regions and outliers survive while dense clusters are thinned.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    if len(valid) <= max_points:
+        return valid
+
+    rng = np.random.default_rng(seed)
+    order = valid[rng.permutation(len(valid))]
+    cells = _cell_ids(x[order], y[order], bins)
+    rank = pd.Series(cells).groupby(cells).cumcount().to_numpy()
+
+    # Smallest per-cell quota that fills the budget
+    counts = np.bincount(cells)
+    counts = counts[counts > 0]
+    lo, hi = 1, int(counts.max())
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if np.minimum(counts, mid).sum() >= max_points:
+            hi = mid
+        else:
+            lo = mid + 1
+    keep = order[rank < lo]
+    if len(keep) > max_points:
+        keep = rng.choice(keep, max_points, replace=False)
+    return np.sort(keep)
+
+
+def _cell_ids(x, y, bins):
+    """Flat grid-cell id of every point on a bins x bins grid spanning the data"""
+    def axis_bin(values):
+        lo, hi = values.min(), values.max()
+        if hi == lo:
+            return np.zeros(len(values), dtype=np.int64)
+        return np.minimum(((values - lo) / (hi - lo) * bins).astype(np.int64), bins - 1)
+    return axis_bin(x) * bins + axis_bin(y)
+
+
+def level_of_detail(y, window, max_points, reducer=lttb_indices):
+    """Indices for a zoomable line plus the dataZoom (start, end) percentages.
+
+    The visible `window` (first, last index) gets the full point budget and
+    the regions either side a coarse overview, so zooming in reveals detail
+    while the slider still shows the whole series.
+    """
+    n = len(y)
+    if window is None:
+        return reducer(y, max_points), (0, 100)
+
+    lo, hi = max(0, window[0]), min(n - 1, window[1])
+    context = max(max_points // 4, 3)
+    before = reducer(y[:lo], context)
+    inside = lo + reducer(y[lo:hi + 1], max_points)
+    after = hi + 1 + reducer(y[hi + 1:], context)
+    indices = np.concatenate([before, inside, after])
+    last = max(len(indices) - 1, 1)
+    return indices, (len(before) / last * 100, (len(before) + len(inside) - 1) / last * 100)
+
+
+def window_from_zoom(indices, start, end):
+    """Original (first, last) index covered by dataZoom percentages over plotted `indices`"""
+    last = len(indices) - 1
+    first = int(round(start / 100 * last))
+    final = int(round(end / 100 * last))
+    return int(indices[first]), int(indices[final])
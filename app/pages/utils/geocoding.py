@@ -0,0 +1,177 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# Geoapify geocoding with three local layers in front of the network: an
+# in-process dict, the prebuilt Area table shipped with the app, and a SQLite
+# cache shared by every process on the host. Addresses are normalized before
+# lookup, so spelling variants of one place share an entry. Misses are
+# fetched in batches over one pooled session with bounded concurrency and
+# timeouts; places Geoapify does not know are cached too, for a shorter time.
+# The Area table is generated from the rents collection, which is not in the
+# repo: run scripts/build_area_coordinates.py against the database to write
+# data/area_coordinates.csv, and commit it with the app. Until then that layer
+# is empty and lookups fall through to the cache and Geoapify.
+GEOCODE_URL = "https://api.geoapify.com"
+CACHE_PATH = os.path.join(os.path.dirname(__file__), "..", "..", ".cache", "geocode.sqlite")
+AREA_TABLE = os.path.join(os.path.dirname(__file__), "data", "area_coordinates.csv")
+NOT_FOUND_TTL = 7 * 24 * 3600
+TIMEOUT = (3.05, 10)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS places (
+    address TEXT PRIMARY KEY,
+    lat REAL,
+    lon REAL,
+    created REAL NOT NULL
+);
+"""
+
+
+def normalize_address(address):
+    """Case-folded address with punctuation runs and whitespace collapsed"""
+    return re.sub(r"[\s,;.]+", " ", str(address)).strip().casefold()
+
+
+def read_area_table(path=AREA_TABLE):
+    """Prebuilt {normalized area: (lat, lon)}, empty when the table is not shipped"""
+    try:
+        table = pd.read_csv(path)
+    except (OSError, pd.errors.EmptyDataError):
+        return {}
+    return {
+        normalize_address(area): (float(lat), float(lon))
+        for area, lat, lon in table[["Area", "Latitude", "Longitude"]].itertuples(index=False)
+    }
+
+
+def connect(path=CACHE_PATH):
+    """Open the geocode cache, creating it on first use"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def cached_places(keys, not_found_ttl=NOT_FOUND_TTL, path=CACHE_PATH):
+    """{key: (lat, lon) or None} for the keys the cache holds; stale misses are left out"""
+    conn = connect(path)
+    try:
+        found = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = conn.execute(
+                f"SELECT address, lat, lon FROM places WHERE address IN ({','.join('?' * len(chunk))})"
+                " AND (lat IS NOT NULL OR created >= ?)",
+                (*chunk, time.time() - not_found_ttl)
+            )
+            found.update({key: None if lat is None else (lat, lon) for key, lat, lon in rows})
+        return found
+    finally:
+        conn.close()
+
+
+def store_places(places, path=CACHE_PATH):
+    """Persist {key: (lat, lon) or None}"""
+    now = time.time()
+    conn = connect(path)
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO places (address, lat, lon, created) VALUES (?, ?, ?, ?)",
+                [(key, *(place or (None, None)), now) for key, place in places.items()]
+            )
+    finally:
+        conn.close()
+
+
+def pooled_session(pool_size, retries=2):
+    """Session whose connection pool matches the worker count, retrying throttled and failed requests"""
+    session = requests.Session()
+    retry = Retry(total=retries, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504), allowed_methods=("GET",))
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["Accept"] = "application/json"
+    return session
+
+
+class Geocoder:
+    """Batch geocoder resolving from memory, the Area table and the SQLite cache before Geoapify"""
+
+    def __init__(self, api_key, base_url=GEOCODE_URL, suffix=", Dubai, UAE", max_workers=8,
+                 timeout=TIMEOUT, cache_path=CACHE_PATH, area_table=AREA_TABLE):
+        self.api_key = api_key
+        self.url = base_url.rstrip("/") + "/v1/geocode/search"
+        self.suffix = suffix
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.cache_path = cache_path
+        self.session = pooled_session(max_workers)
+        self.memory = read_area_table(area_table) if area_table else {}
+        self.lock = threading.Lock()
+
+    def lookup(self, address):
+        """(lat, lon) of one address, or None if it cannot be resolved"""
+        return self.lookup_many([address])[address]
+
+    def lookup_many(self, addresses):
+        """{address: (lat, lon) or None}, fetching only what no local layer holds"""
+        keys = {address: normalize_address(address) for address in addresses}
+        with self.lock:
+            missing = sorted({key for key in keys.values() if key not in self.memory})
+        if missing:
+            self._resolve(missing)
+        with self.lock:
+            return {address: self.memory.get(key) for address, key in keys.items()}
+
+    def _resolve(self, keys):
+        try:
+            found = cached_places(keys, path=self.cache_path)
+        except (sqlite3.Error, OSError):
+            found = {}
+        remaining = [key for key in keys if key not in found]
+        if remaining:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(remaining))) as pool:
+                fetched = dict(zip(remaining, pool.map(self._fetch, remaining)))
+            # Failed requests are left uncached so a later lookup retries them
+            fetched = {key: place for key, place in fetched.items() if place is not False}
+            try:
+                store_places(fetched, path=self.cache_path)
+            except (sqlite3.Error, OSError):
+                pass
+            found.update(fetched)
+        with self.lock:
+            self.memory.update(found)
+
+    def _fetch(self, key):
+        """(lat, lon) from Geoapify, None if it has no match, False if the request failed"""
+        params = {"text": key + self.suffix, "limit": 1, "apiKey": self.api_key}
+        try:
+            resp = self.session.get(self.url, params=params, timeout=self.timeout)
+            resp.raise_for_status()
+            features = resp.json().get("features") or []
+            if not features:
+                return None
+            properties = features[0]["properties"]
+            return float(properties["lat"]), float(properties["lon"])
+        except (requests.RequestException, ValueError, KeyError, IndexError, TypeError, AttributeError):
+            # Unreachable or malformed responses count as failures, which are not cached
+            return False
+
+
+@lru_cache(maxsize=None)
+def shared_geocoder(api_key, base_url=GEOCODE_URL):
+    """The process-wide geocoder for a key and endpoint, shared by every page and session"""
+    return Geocoder(api_key, base_url)
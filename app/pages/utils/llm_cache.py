@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+
+# Persistent cache of LLM responses, shared by every session and process on
+# the host. Entries are keyed on a hash of the model and the exact messages,
+# expire after a TTL, and the least recently used are evicted once the stored
+# text exceeds a size budget. SQLite in WAL mode lets concurrent readers and a
+# writer share the file.
+CACHE_PATH = os.path.join(os.path.dirname(__file__), "..", "..", ".cache", "llm_responses.sqlite")
+DEFAULT_TTL = 24 * 3600
+MAX_BYTES = 20 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL,
+    response TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+"""
+
+
+def cache_key(model, messages):
+    """Stable hash of a chat request"""
+    payload = json.dumps({"model": model, "messages": messages}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def connect(path=CACHE_PATH):
+    """Open the cache database, creating it on first use"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def get(key, ttl=DEFAULT_TTL, path=CACHE_PATH):
+    """Cached response for `key` if younger than `ttl` seconds, else None"""
+    now = time.time()
+    conn = connect(path)
+    try:
+        with conn:
+            row = conn.execute(
+                "SELECT response FROM responses WHERE key = ? AND created >= ?", (key, now - ttl)
+            ).fetchone()
+            if row is not None:
+                conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        return row[0] if row else None
+    finally:
+        conn.close()
+
+
+def put(key, model, response, ttl=DEFAULT_TTL, max_bytes=MAX_BYTES, path=CACHE_PATH):
+    """Store a response, then drop expired entries and the least recently used beyond `max_bytes`"""
+    now = time.time()
+    conn = connect(path)
+    try:
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, created, accessed, size, response) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, now, now, len(response.encode()), response)
+            )
+            conn.execute("DELETE FROM responses WHERE created < ?", (now - ttl,))
+            conn.execute("""
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, SUM(size) OVER (ORDER BY accessed DESC, key) AS running FROM responses
+                    ) WHERE running > ?
+                )
+            """, (max_bytes,))
+    finally:
+        conn.close()
+
+
+def lookup(model, messages, ttl=DEFAULT_TTL, path=CACHE_PATH):
+    """Cached response text for a chat request, or None on a miss or an unreadable cache"""
+    try:
+        return get(cache_key(model, messages), ttl, path)
+    except (sqlite3.Error, OSError):
+        return None
+
+
+def store(model, messages, response, ttl=DEFAULT_TTL, path=CACHE_PATH):
+    """Cache a response, ignoring an unwritable cache"""
+    try:
+        put(cache_key(model, messages), model, response, ttl, path=path)
+    except (sqlite3.Error, OSError):
+        pass
+
@@ -0,0 +1,152 @@
+import asyncio
+import threading
+import time
+
+from pages.utils import llm_cache
+
+
+# Process-wide LLM request orchestration. Requests run as coroutines on one
+# background event loop, so independent prompts overlap instead of queueing
+# behind each other. Identical requests that are already in flight are
+# coalesced onto a single upstream call, whose streamed text any number of
+# sessions can follow, and a concurrency limit plus a token-bucket rate
+# limiter keep bursts under the provider's throttling thresholds.
+
+
+class Flight:
+    """One upstream response that readers on any thread can follow as it streams"""
+
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.condition = threading.Condition()
+
+    @classmethod
+    def completed(cls, text):
+        """A flight for an already known response"""
+        flight = cls()
+        flight.append(text)
+        flight.finish()
+        return flight
+
+    @classmethod
+    def failed(cls, error):
+        """A flight for a request that could not be made"""
+        flight = cls()
+        flight.finish(error)
+        return flight
+
+    def append(self, chunk):
+        with self.condition:
+            self.chunks.append(chunk)
+            self.condition.notify_all()
+
+    def finish(self, error=None):
+        with self.condition:
+            self.error = error
+            self.done = True
+            self.condition.notify_all()
+
+    def follow(self, timeout=None):
+        """Yield every chunk from the start, waiting for new ones until the response ends"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        position = 0
+        while True:
+            with self.condition:
+                while position == len(self.chunks) and not self.done:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("LLM response timed out")
+                    self.condition.wait(remaining)
+                pending = self.chunks[position:]
+                finished, error = self.done, self.error
+            for chunk in pending:
+                yield chunk
+            position += len(pending)
+            if finished and position == len(self.chunks):
+                if error is not None:
+                    raise error
+                return
+
+    def text(self, timeout=None):
+        """Full response text once it has finished"""
+        return "".join(self.follow(timeout))
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` requests per second with bursts of `burst`"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class LLMOrchestrator:
+    """Coalesced, rate-limited chat requests streamed on a background event loop"""
+
+    def __init__(self, client, max_concurrent=4, rate=1.0, burst=2, timeout=120):
+        self.client = client
+        self.timeout = timeout
+        self.in_flight = {}
+        self.lock = threading.Lock()
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, name="llm-orchestrator", daemon=True).start()
+        # Loop-bound primitives are created on the loop itself
+        self.semaphore, self.limiter = asyncio.run_coroutine_threadsafe(
+            self._primitives(max_concurrent, rate, burst), self.loop
+        ).result()
+
+    @staticmethod
+    async def _primitives(max_concurrent, rate, burst):
+        return asyncio.Semaphore(max_concurrent), RateLimiter(rate, burst)
+
+    def request(self, model, messages):
+        """Flight for a chat request: cached, joined if already in flight, or started upstream"""
+        cached = llm_cache.lookup(model, messages)
+        if cached is not None:
+            return Flight.completed(cached)
+
+        key = llm_cache.cache_key(model, messages)
+        with self.lock:
+            flight = self.in_flight.get(key)
+            if flight is None:
+                flight = self.in_flight[key] = Flight()
+                asyncio.run_coroutine_threadsafe(self._run(key, model, messages, flight), self.loop)
+        return flight
+
+    async def _run(self, key, model, messages, flight):
+        try:
+            await asyncio.wait_for(self._stream(model, messages, flight), self.timeout)
+            text = "".join(flight.chunks)
+            if text:
+                llm_cache.store(model, messages, text)
+            flight.finish()
+        except Exception as e:
+            flight.finish(e)
+        finally:
+            with self.lock:
+                self.in_flight.pop(key, None)
+
+    async def _stream(self, model, messages, flight):
+        async with self.semaphore:
+            await self.limiter.acquire()
+            stream = await self.client.chat.stream_async(model=model, messages=messages)
+            async for event in stream:
+                content = event.data.choices[0].delta.content
+                if isinstance(content, str) and content:
+                    flight.append(content)
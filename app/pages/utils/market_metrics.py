@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+
+
+# Market metrics engine. A dataset indexed by period start is summarised once
+# into per-quarter prefix aggregates: row and value counts, value sums and
+# value histograms, optionally per group (e.g. area). Any date range is then
+# answered by differencing two prefix rows, so metrics for a new range never
+# rescan the rows. Quantiles and medians are read from the range histogram
+# and are exact to within one bin.
+QUANTILES = (0.25, 0.5, 0.75)
+BINS = 256
+GROUP_BINS = 128
+
+
+def _bin_edges(values, bins):
+    """Log-spaced edges for positive data, linear otherwise"""
+    finite = values[np.isfinite(values)]
+    if finite.size == 0:
+        return np.linspace(0.0, 1.0, bins + 1)
+    lo, hi = finite.min(), finite.max()
+    if hi == lo:
+        return np.linspace(lo - 0.5, hi + 0.5, bins + 1)
+    if lo > 0:
+        return np.geomspace(lo, hi, bins + 1)
+    return np.linspace(lo, hi, bins + 1)
+
+
+def _bin_of(values, edges):
+    return np.clip(np.searchsorted(edges, values, side="right") - 1, 0, len(edges) - 2)
+
+
+def _prefix(counts):
+    """Cumulative sums along the quarter axis with a leading zero row"""
+    return np.concatenate([np.zeros((1,) + counts.shape[1:]), np.cumsum(counts, axis=0)])
+
+
+def build_summary(frame, value, group=None, bins=BINS, group_bins=GROUP_BINS):
+    """Per-quarter prefix aggregates of one value column, and of each `group` value if given"""
+    frame = frame[frame.index.notna()]
+    if len(frame) == 0:
+        return None
+    periods = pd.PeriodIndex(frame.index, freq="Q")
+    ordinals = periods.asi8
+    values = pd.to_numeric(frame[value], errors="coerce").to_numpy(dtype=float)
+
+    first = ordinals.min()
+    n_quarters = ordinals.max() - first + 1
+    quarter = ordinals - first
+    present = np.isfinite(values)
+
+    edges = _bin_edges(values, bins)
+    flat = quarter[present] * bins + _bin_of(values[present], edges)
+    summary = {
+        "quarters": pd.period_range(periods.min(), periods.max(), freq="Q"),
+        "edges": edges,
+        "rows": _prefix(np.bincount(quarter, minlength=n_quarters).astype(float)),
+        "count": _prefix(np.bincount(quarter[present], minlength=n_quarters).astype(float)),
+        "sum": _prefix(np.bincount(quarter[present], weights=values[present], minlength=n_quarters)),
+        "hist": _prefix(np.bincount(flat, minlength=n_quarters * bins).reshape(n_quarters, bins).astype(float))
+    }
+
+    if group is not None:
+        codes, labels = pd.factorize(frame[group])
+        keep = present & (codes >= 0)
+        n_groups = len(labels)
+        group_edges = _bin_edges(values, group_bins)
+        cell = quarter[keep] * n_groups + codes[keep]
+        flat = cell * group_bins + _bin_of(values[keep], group_edges)
+        summary.update({
+            "groups": pd.Index(labels).astype(str),
+            "group_edges": group_edges,
+            "group_count": _prefix(np.bincount(cell, minlength=n_quarters * n_groups).reshape(n_quarters, n_groups).astype(float)),
+            "group_hist": _prefix(
+                np.bincount(flat, minlength=n_quarters * n_groups * group_bins)
+                .reshape(n_quarters, n_groups, group_bins).astype(float)
+            )
+        })
+    return summary
+
+
+def quantiles_from_hist(hist, edges, qs):
+    """Quantiles of histogram counts along the last axis, interpolated within the bin"""
+    hist = np.asarray(hist, dtype=float)
+    cumulative = np.cumsum(hist, axis=-1)
+    total = cumulative[..., -1:]
+    result = []
+    for q in qs:
+        target = q * total
+        b = np.minimum((cumulative < target).sum(axis=-1, keepdims=True), hist.shape[-1] - 1)
+        before = np.take_along_axis(cumulative, b, axis=-1) - np.take_along_axis(hist, b, axis=-1)
+        width = np.take_along_axis(hist, b, axis=-1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            frac = np.clip(np.where(width > 0, (target - before) / width, 0.5), 0, 1)
+        value = edges[b] + frac * (edges[b + 1] - edges[b])
+        result.append(np.where(total > 0, value, np.nan)[..., 0])
+    return result
+
+
+def _between(summary, key, lo, hi):
+    return summary[key][hi] - summary[key][lo]
+
+
+def _mean(summary, lo, hi):
+    count = _between(summary, "count", lo, hi)
+    return _between(summary, "sum", lo, hi) / count if count else np.nan
+
+
+def _growth(new, old):
+    return (new / old - 1) * 100 if old and np.isfinite(old) and np.isfinite(new) else np.nan
+
+
+def range_metrics(summary, start, end, top_groups=5, min_group_count=20):
+    """Summary statistics for quarters starting between `start` and `end`"""
+    if summary is None:
+        return None
+    starts = summary["quarters"].start_time
+    lo = int(starts.searchsorted(pd.Timestamp(start), side="left"))
+    hi = int(starts.searchsorted(pd.Timestamp(end), side="right"))
+    if hi <= lo:
+        return None
+
+    hist = _between(summary, "hist", lo, hi)
+    quantiles = quantiles_from_hist(hist, summary["edges"], QUANTILES)
+    quarterly_rows = np.diff(summary["rows"][lo:hi + 1])
+    # Sparse series (e.g. annual ones on a quarterly grid) report their first and last observed quarters
+    observed = lo + np.flatnonzero(np.diff(summary["count"][lo:hi + 1]) > 0)
+    first, latest = (observed[0], observed[-1]) if len(observed) else (lo, hi - 1)
+    metrics = {
+        "first_quarter": summary["quarters"][lo],
+        "last_quarter": summary["quarters"][hi - 1],
+        "rows": int(_between(summary, "rows", lo, hi)),
+        "mean": _mean(summary, lo, hi),
+        "quantiles": dict(zip(QUANTILES, (float(q) for q in quantiles))),
+        "first_observed": summary["quarters"][first],
+        "latest_observed": summary["quarters"][latest],
+        "first_mean": _mean(summary, first, first + 1),
+        "latest_mean": _mean(summary, latest, latest + 1),
+        "first_rows": int(quarterly_rows[0]),
+        "latest_rows": int(quarterly_rows[-1]),
+        "yoy_mean": np.nan,
+        "yoy_rows": np.nan
+    }
+
+    # Latest four quarters against the four before them
+    if hi - lo >= 8:
+        metrics["yoy_mean"] = _growth(_mean(summary, hi - 4, hi), _mean(summary, hi - 8, hi - 4))
+        metrics["yoy_rows"] = _growth(_between(summary, "rows", hi - 4, hi), _between(summary, "rows", hi - 8, hi - 4))
+
+    if "groups" in summary:
+        counts = _between(summary, "group_count", lo, hi)
+        eligible = np.flatnonzero(counts >= min_group_count)
+        medians = quantiles_from_hist(_between(summary, "group_hist", lo, hi)[eligible], summary["group_edges"], (0.5,))[0]
+        metrics["group_medians"] = pd.Series(medians, index=summary["groups"][eligible]).nlargest(top_groups)
+    return metrics
@@ -0,0 +1,153 @@
+import folium
+import pandas as pd
+from branca.element import MacroElement
+from folium.plugins import FastMarkerCluster, HeatMap
+from jinja2 import Template
+
+from pages.utils.density_grid import GRID_LEVELS, cell_features, cell_index, heat_rows
+
+
+# Property map engine. Markers are aggregated on the server, one per occupied
+# grid cell, so the payload grows with the area the data covers rather than
+# with the number of contracts. Cell rows are handed to the browser as one
+# compact array that Leaflet clusters further at low zoom, instead of one
+# folium.Marker (and its own JS/HTML block) per location. Density layers are
+# drawn from the same pre-aggregated grid cells, switching to finer cells as
+# the map zooms in.
+DUBAI_CENTER = [25.2048, 55.2708]
+CELL_LAYER_LEVEL = "District (~2 km cells)"
+MARKER_LEVEL = "District (~2 km cells)"
+CELL_FIELDS = ("Area", "Property Type")
+# Lowest zoom at which each density level is drawn; it gives way to the next
+DENSITY_ZOOMS = {
+    "City (~11 km cells)": 0,
+    "District (~2 km cells)": 11,
+    "Block (~500 m cells)": 14
+}
+
+# Builds each cell marker and its popup in the browser from a compact
+# [lat, lon, area, property type, contracts, mean rent] row
+MARKER_CALLBACK = """
+function (row) {
+    var amount = row[5] === null ? "n/a" : Math.round(row[5]).toLocaleString("en-US") + " AED";
+    var lines = [
+        "<b>Area:</b> " + row[2],
+        "<b>Property Type:</b> " + row[3],
+        "<b>Contracts:</b> " + row[4].toLocaleString("en-US"),
+        "<b>Mean rent:</b> " + amount
+    ];
+    var marker = L.marker(new L.LatLng(row[0], row[1]));
+    marker.bindPopup(lines.join("<br>"), {maxWidth: 300});
+    marker.bindTooltip(row[2] + " (" + row[4].toLocaleString("en-US") + ")");
+    return marker;
+}
+"""
+
+
+def most_common(points, keys, col):
+    """Most frequent value of `col` per `keys` group"""
+    counts = points.groupby(keys + [col], sort=False).size().reset_index(name="n")
+    top = counts.sort_values("n", ascending=False, kind="stable").drop_duplicates(keys)
+    return top.set_index(keys)[col]
+
+
+def marker_cells(rental_data, cell_size):
+    """Per occupied cell: mean location, most common Area and Property Type, contract count and mean rent"""
+    points = rental_data.dropna(subset=["Latitude", "Longitude"])
+    row, col = cell_index(points, cell_size)
+    points = pd.DataFrame({
+        "row": row,
+        "col": col,
+        "Latitude": points["Latitude"].to_numpy(dtype=float),
+        "Longitude": points["Longitude"].to_numpy(dtype=float),
+        "amount": pd.to_numeric(points["Contract Amount"], errors="coerce").to_numpy(),
+        **{field: points[field].astype(str).to_numpy() for field in CELL_FIELDS}
+    })
+    keys = ["row", "col"]
+    cells = points.groupby(keys, sort=False).agg(
+        Latitude=("Latitude", "mean"),
+        Longitude=("Longitude", "mean"),
+        count=("amount", "size"),
+        mean_amount=("amount", "mean")
+    )
+    for field in CELL_FIELDS:
+        cells[field] = most_common(points, keys, field)
+    return cells.reset_index(drop=True)
+
+
+def marker_rows(cells):
+    """[lat, lon, area, property type, contracts, mean rent] rows for the cluster layer, built per column"""
+    mean_amount = cells["mean_amount"].round()
+    columns = [
+        cells["Latitude"].round(6).tolist(),
+        cells["Longitude"].round(6).tolist(),
+        *(cells[field].tolist() for field in CELL_FIELDS),
+        cells["count"].astype(int).tolist(),
+        mean_amount.astype(object).where(mean_amount.notna(), None).tolist()
+    ]
+    return [list(row) for row in zip(*columns)]
+
+
+class ZoomSwitch(MacroElement):
+    """Keeps exactly one layer of a group on the map, picked by the current zoom"""
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        (function () {
+            var map = {{ this._parent.get_name() }};
+            var group = {{ this.group.get_name() }};
+            var levels = [{% for layer, zoom in this.levels %}[{{ layer.get_name() }}, {{ zoom }}],{% endfor %}];
+            function update() {
+                var zoom = map.getZoom();
+                levels.forEach(function (level, i) {
+                    var next = levels[i + 1];
+                    var active = zoom >= level[1] && (!next || zoom < next[1]);
+                    if (active && !group.hasLayer(level[0])) { group.addLayer(level[0]); }
+                    if (!active && group.hasLayer(level[0])) { group.removeLayer(level[0]); }
+                });
+            }
+            map.on("zoomend", update);
+            update();
+        })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, group, levels):
+        super().__init__()
+        self._name = "ZoomSwitch"
+        self.group = group
+        self.levels = levels
+
+
+def build_map(rental_data, grids):
+    """Clustered per-cell property markers with grid-aggregated density layers"""
+    m = folium.Map(location=DUBAI_CENTER, zoom_start=6)
+    cells = marker_cells(rental_data, GRID_LEVELS[MARKER_LEVEL])
+    FastMarkerCluster(marker_rows(cells), callback=MARKER_CALLBACK, name="Properties").add_to(m)
+
+    # One heat layer per grid resolution under a single toggle; the zoom picks which is drawn
+    density = folium.FeatureGroup(name="Density").add_to(m)
+    levels = sorted(
+        ((HeatMap(heat_rows(grid), control=False).add_to(density), DENSITY_ZOOMS[level]) for level, grid in grids.items()),
+        key=lambda level: level[1]
+    )
+    ZoomSwitch(density, levels).add_to(m)
+
+    if CELL_LAYER_LEVEL in grids:
+        folium.GeoJson(
+            cell_features(grids[CELL_LAYER_LEVEL], GRID_LEVELS[CELL_LAYER_LEVEL]),
+            name=f"Cells: {CELL_LAYER_LEVEL}",
+            show=False,
+            style_function=lambda feature: {"color": "#08AAF6", "weight": 1, "fillOpacity": 0.1},
+            tooltip=folium.GeoJsonTooltip(fields=["Contracts", "Mean rent (AED)"])
+        ).add_to(m)
+
+    folium.LayerControl(collapsed=True).add_to(m)
+    return m
+
+
+def render_map_html(rental_data, grids, width=700, height=500):
+    """Standalone HTML document for the property map"""
+    figure = folium.Figure(width=width, height=height)
+    figure.add_child(build_map(rental_data, grids))
+    return figure.render()
@@ -0,0 +1,21 @@
+# MongoDB aggregation pipelines for Analysis page charts that group in the
+# database. Each builder returns a pipeline whose output rows are already
+# shaped like the pandas result the chart used to compute client-side. Rent
+# summaries come from the local rollup table instead (see rollups.py).
+
+
+def hotel_indicator_pipeline():
+    """Mean value per time period and hotel indicator, in long format"""
+    return [
+        {"$group": {
+            "_id": {"period": "$Time Period", "indicator": "$Hotel Indicator"},
+            "Value": {"$avg": "$Value"}
+        }},
+        {"$sort": {"_id.period": 1}},
+        {"$project": {
+            "_id": 0,
+            "Time Period": "$_id.period",
+            "Hotel Indicator": "$_id.indicator",
+            "Value": 1
+        }}
+    ]
@@ -0,0 +1,38 @@
+import pandas as pd
+
+
+# Frequency conversion onto a quarterly grid with index operations only.
+# Finer series (monthly) are aggregated per quarter; coarser ones (annual) are
+# spread over the quarters they cover by forward-fill or interpolation. The
+# output is indexed by quarter-end dates, matching resample('QE').
+
+
+def to_quarterly(series, source="Q", agg="mean", fill=None, anchor="end"):
+    """Quarterly series from a datetime-indexed one observed at `source` frequency.
+
+    Rows are grouped by quarter with `agg`, then reindexed onto every quarter
+    from the first observation to the end of the last `source` period, so an
+    annual value covers Q1-Q4 of its year. `fill` is None (leave gaps),
+    "ffill" or "interpolate" (linear between observations, then carried to
+    the end of the last period). `anchor` places each quarter on its "end" or
+    "start" date.
+    """
+    series = series[series.index.notna()]
+    quarters = pd.PeriodIndex(series.index, freq="Q")
+    per_quarter = series.groupby(quarters).agg(agg)
+    if per_quarter.empty:
+        return pd.Series(dtype=float, index=pd.DatetimeIndex([]), name=series.name)
+
+    last = pd.Period(series.index.max(), freq=source).asfreq("Q", how="end")
+    full = pd.period_range(per_quarter.index.min(), max(last, per_quarter.index.max()), freq="Q")
+    quarterly = per_quarter.reindex(full).astype(float)
+
+    if fill == "ffill":
+        quarterly = quarterly.ffill()
+    elif fill == "interpolate":
+        quarterly = quarterly.interpolate(method="linear", limit_area="inside").ffill()
+    elif fill is not None:
+        raise ValueError(f"Unknown fill: {fill}")
+
+    quarterly.index = full.to_timestamp(how="end").normalize() if anchor == "end" else full.to_timestamp(how="start")
+    return quarterly
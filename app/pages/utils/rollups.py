@@ -0,0 +1,136 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from pages.utils.snapshots import write_parquet
+
+
+# Pre-aggregated rollup tables kept next to the collection snapshots. Each
+# holds the row count and count/sum/min/max of its measures per dimension
+# combination, which merge associatively: rows appended by a snapshot sync are
+# rolled up on their own and folded into the stored table instead of
+# re-aggregating the whole collection. Dashboard views read these tables.
+ROLLUP_DIR = os.path.join(os.path.dirname(__file__), "..", "..", ".cache", "rollups")
+VERSION_KEY = b"rollup_version"
+ROWS_KEY = b"rollup_rows"
+STATS = ("count", "sum", "min", "max")
+MERGE_STATS = {"count": "sum", "sum": "sum", "min": "min", "max": "max"}
+ROLLUPS = {
+    "rents": {
+        "dimensions": ("Quarter", "Area", "Property Type", "Usage"),
+        "measures": ("Contract Amount",)
+    }
+}
+
+
+def rollup_columns(spec):
+    """Column layout of a rollup table"""
+    stats = [f"{measure} {stat}" for measure in spec["measures"] for stat in STATS]
+    return list(spec["dimensions"]) + stats + ["rows"]
+
+
+def rollup(frame, spec):
+    """Row count and count/sum/min/max of each measure per dimension combination"""
+    dimensions = list(spec["dimensions"])
+    # String keys keep the table Arrow-typable and stable across merges
+    keys = frame[dimensions].astype("string")
+    values = pd.DataFrame({m: pd.to_numeric(frame[m], errors="coerce") for m in spec["measures"]}, index=frame.index)
+    grouped = pd.concat([keys, values], axis=1).groupby(dimensions, dropna=False, sort=False)
+    table = grouped.agg(
+        **{f"{m} {stat}": (m, stat) for m in spec["measures"] for stat in STATS},
+        rows=(spec["measures"][0], "size")
+    )
+    return table.reset_index()[rollup_columns(spec)]
+
+
+def merge(tables, spec):
+    """Combine rollup tables covering disjoint rows into one"""
+    dimensions = list(spec["dimensions"])
+    combined = pd.concat(tables, ignore_index=True)
+    combined[dimensions] = combined[dimensions].astype("string")
+    aggregations = {f"{m} {stat}": MERGE_STATS[stat] for m in spec["measures"] for stat in STATS}
+    aggregations["rows"] = "sum"
+    table = combined.groupby(dimensions, dropna=False, sort=False).agg(aggregations)
+    return table.reset_index()[rollup_columns(spec)]
+
+
+def rollup_path(name, rollup_dir=ROLLUP_DIR):
+    return os.path.join(rollup_dir, f"{name}.parquet")
+
+
+def rollup_state(path):
+    """(dataset version, fact row count) a rollup file reflects, or None if there is none"""
+    try:
+        metadata = pq.read_schema(path, memory_map=True).metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    if VERSION_KEY not in metadata:
+        return None
+    return metadata[VERSION_KEY].decode(), int(metadata[ROWS_KEY])
+
+
+def read(name, version=None, rollup_dir=ROLLUP_DIR):
+    """Stored rollup table, or None if it is missing or was built for another version"""
+    path = rollup_path(name, rollup_dir)
+    state = rollup_state(path)
+    if state is None or (version is not None and state[0] != str(version)):
+        return None
+    return pq.read_table(path, memory_map=True).to_pandas()
+
+
+def update(name, frame, delta, rollup_dir=ROLLUP_DIR):
+    """Bring a rollup in step with a synced dataset and return it.
+
+    `frame` and `delta` are what snapshots.sync returned. When the stored
+    rollup covers every row except `delta`, only the delta is aggregated and
+    merged in; otherwise the rollup is rebuilt from `frame`.
+    """
+    spec = ROLLUPS[name]
+    path = rollup_path(name, rollup_dir)
+    version = str(frame.attrs.get("version"))
+    state = rollup_state(path)
+    if state == (version, len(frame)):
+        return read(name, rollup_dir=rollup_dir)
+
+    table = None
+    if state is not None and delta is not None and len(delta) and state[1] + len(delta) == len(frame):
+        table = merge([read(name, rollup_dir=rollup_dir), rollup(delta, spec)], spec)
+    if table is None:
+        table = rollup(frame, spec)
+
+    try:
+        write_parquet(path, table, {VERSION_KEY: version.encode(), ROWS_KEY: str(len(frame)).encode()})
+    except (OSError, pa.ArrowException):
+        # Served from memory, rebuilt on the next sync
+        pass
+    return table
+
+
+# Dashboard views over a rollup table. Missing keys are dropped, as a pandas
+# groupby over the fact rows would.
+
+def quarterly_summary(table, measure="Contract Amount"):
+    """Mean and count of a measure per quarter"""
+    by_quarter = table.groupby("Quarter")[[f"{measure} sum", f"{measure} count"]].sum()
+    count = by_quarter[f"{measure} count"]
+    return pd.DataFrame({
+        "Quarter": by_quarter.index.astype(object),
+        "mean": (by_quarter[f"{measure} sum"] / count.where(count > 0)).to_numpy(),
+        "count": count.to_numpy()
+    })
+
+
+def top_means(table, dimension, measure="Contract Amount", limit=10):
+    """Highest mean of a measure per dimension value"""
+    grouped = table.groupby(dimension)[[f"{measure} sum", f"{measure} count"]].sum()
+    count = grouped[f"{measure} count"]
+    means = (grouped[f"{measure} sum"] / count.where(count > 0)).dropna().nlargest(limit)
+    return pd.DataFrame({dimension: means.index.astype(object), "mean": means.to_numpy()})
+
+
+def dimension_counts(table, dimension):
+    """Fact row count per dimension value, most common first"""
+    counts = table.groupby(dimension)["rows"].sum().sort_values(ascending=False)
+    return pd.DataFrame({dimension: counts.index.astype(object), "count": counts.to_numpy()})
@@ -0,0 +1,120 @@
+import hashlib
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from bson import ObjectId
+
+
+# Local columnar snapshots of MongoDB collections, so a restarted process can
+# serve its first page from disk instead of re-downloading from Atlas.
+# Collections only grow by appending, so a stale snapshot is brought up to
+# date by pulling the documents past its _id high-water mark.
+SNAPSHOT_DIR = os.path.join(os.path.dirname(__file__), "..", "..", ".cache", "snapshots")
+COUNT_KEY = b"snapshot_count"
+HIGH_WATER_KEY = b"snapshot_high_water"
+
+
+def collection_state(collection):
+    """Cheap change marker: (document count, newest _id)"""
+    count = collection.estimated_document_count()
+    newest = collection.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+    return count, (newest["_id"] if newest else None)
+
+
+def snapshot_path(collection_name, columns, snapshot_dir=SNAPSHOT_DIR):
+    """One Parquet file per collection and projection"""
+    key = hashlib.sha1(repr(columns).encode()).hexdigest()[:12]
+    return os.path.join(snapshot_dir, f"{collection_name}-{key}.parquet")
+
+
+def snapshot_state(path):
+    """(count, high-water _id) stored in a snapshot's footer, or None if there is no usable snapshot"""
+    try:
+        metadata = pq.read_schema(path, memory_map=True).metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    if COUNT_KEY not in metadata:
+        return None
+    high_water = metadata.get(HIGH_WATER_KEY, b"").decode()
+    return int(metadata[COUNT_KEY]), (ObjectId(high_water) if high_water else None)
+
+
+def read_snapshot(path):
+    """Memory-map a snapshot into a DataFrame"""
+    return pq.read_table(path, memory_map=True).to_pandas()
+
+
+def write_parquet(path, frame, metadata):
+    """Write a zstd-compressed Parquet file atomically with extra footer metadata"""
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), **metadata})
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    pq.write_table(table, tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+
+
+def write_snapshot(path, frame, state):
+    """Write a snapshot atomically, tagged with its collection state"""
+    count, high_water = state
+    if "_id" in frame.columns:
+        frame = frame.assign(_id=frame["_id"].astype(str))
+    write_parquet(path, frame, {
+        COUNT_KEY: str(count).encode(),
+        HIGH_WATER_KEY: str(high_water or "").encode()
+    })
+
+
+def state_version(state):
+    """Stable string form of a collection state, for cache keys"""
+    count, high_water = state
+    return f"{count}:{high_water or ''}"
+
+
+def sync(collection, columns, loader, snapshot_dir=SNAPSHOT_DIR):
+    """Bring a collection's snapshot up to date and return (frame, delta).
+
+    `loader(collection, columns, query)` pulls documents from MongoDB. When
+    the collection only gained documents since the snapshot, just those are
+    pulled and appended, and returned as `delta`. A fresh snapshot returns an
+    empty delta; a full reload (first load, deletes or rewrites) returns None.
+    The frame's attrs["version"] identifies the collection state it reflects.
+    """
+    path = snapshot_path(collection.name, columns, snapshot_dir)
+    state = collection_state(collection)
+    cached_state = snapshot_state(path)
+
+    if cached_state == state:
+        frame = read_snapshot(path)
+        frame.attrs["version"] = state_version(state)
+        return frame, frame.iloc[:0]
+
+    frame = delta = None
+    if cached_state is not None and cached_state[1] is not None and state[1] is not None:
+        cached_count, high_water = cached_state
+        # Bound the range by the newest _id seen above so late inserts wait for the next sync
+        delta = loader(collection, columns, {"_id": {"$gt": high_water, "$lte": state[1]}})
+        if cached_count + len(delta) == state[0]:
+            frame = pd.concat([read_snapshot(path), delta], ignore_index=True)
+        else:
+            delta = None
+
+    if frame is None:
+        # Same bound as the delta, so documents inserted mid-pull are left for the next sync
+        frame = loader(collection, columns, {} if state[1] is None else {"_id": {"$lte": state[1]}})
+
+    try:
+        write_snapshot(path, frame, state)
+    except (OSError, pa.ArrowException):
+        # Columns Arrow cannot type are still served, just not persisted
+        pass
+    frame.attrs["version"] = state_version(state)
+    return frame, delta
+
+
+def load(collection, columns, loader, snapshot_dir=SNAPSHOT_DIR):
+    """Serve a collection from its snapshot, pulling only what changed since it was written"""
+    return sync(collection, columns, loader, snapshot_dir)[0]
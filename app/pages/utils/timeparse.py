@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+
+# Vectorized parsing of the time formats found across the collections.
+# Date columns repeat a handful of distinct strings over many rows, so values
+# are factorized first, only the distinct labels are parsed with string-array
+# operations, and the result is expanded back with a single take.
+QUARTER_PATTERNS = (
+    r"^(?P<year>\d{4})\s*-?\s*Q(?P<quarter>[1-4])$",   # 2023Q3, 2023-Q3
+    r"^Q(?P<quarter>[1-4])\s*-?\s*(?P<year>\d{4})$"    # Q3-2023, Q3 2023
+)
+YEAR_PATTERN = r"^(?P<year>\d{4})(?:\.0)?$"
+NAT_ORDINAL = np.iinfo(np.int64).min
+
+
+def _factorize(values):
+    """Integer codes per row plus the distinct labels as upper-cased strings"""
+    codes, uniques = pd.factorize(pd.Series(values), use_na_sentinel=True)
+    return codes, pd.Series(uniques, dtype=object).astype(str).str.strip().str.upper()
+
+
+def _expand(index, codes):
+    """Map parsed distinct labels back onto every row; missing rows become NaT"""
+    return index.take(codes, allow_fill=True, fill_value=pd.NaT)
+
+
+def quarter_index(year, quarter):
+    """Quarterly PeriodIndex from numeric year and quarter arrays (NaN gives NaT)"""
+    year = pd.to_numeric(pd.Series(year), errors="coerce").to_numpy(dtype=float)
+    quarter = pd.to_numeric(pd.Series(quarter), errors="coerce").to_numpy(dtype=float)
+    valid = ~np.isnan(year) & ~np.isnan(quarter) & (quarter >= 1) & (quarter <= 4)
+    ordinals = np.full(len(year), NAT_ORDINAL, dtype=np.int64)
+    ordinals[valid] = (year[valid].astype(np.int64) - 1970) * 4 + quarter[valid].astype(np.int64) - 1
+    return pd.PeriodIndex.from_ordinals(ordinals, freq="Q")
+
+
+def _parse_quarter_labels(labels):
+    """Year and quarter fields for "2023Q3" and "Q3-2023" style labels"""
+    year = pd.Series(np.nan, index=labels.index)
+    quarter = pd.Series(np.nan, index=labels.index)
+    for pattern in QUARTER_PATTERNS:
+        fields = labels.str.extract(pattern)
+        year = year.fillna(pd.to_numeric(fields["year"]))
+        quarter = quarter.fillna(pd.to_numeric(fields["quarter"]))
+    return year, quarter
+
+
+def parse_quarters(values):
+    """Quarterly PeriodIndex from "2023Q3", "2023-Q3" or "Q3-2023" labels"""
+    codes, labels = _factorize(values)
+    return _expand(quarter_index(*_parse_quarter_labels(labels)), codes)
+
+
+def quarters_from_fields(year, quarter):
+    """Quarterly PeriodIndex from a year column and a "Q3" or 3 quarter column"""
+    codes, labels = _factorize(quarter)
+    numbers = pd.to_numeric(labels.str.lstrip("Q"), errors="coerce").to_numpy(dtype=float)
+    # Missing rows have code -1, which picks the trailing NaN
+    return quarter_index(year, np.append(numbers, np.nan)[codes])
+
+
+def parse_dates(values):
+    """DatetimeIndex from quarter, year, year-month or full date labels.
+
+    Quarters and years map to their first day, so mixed-granularity columns
+    line up on period starts.
+    """
+    codes, labels = _factorize(values)
+    parsed = pd.Series(pd.NaT, index=labels.index, dtype="datetime64[ns]")
+
+    year, quarter = _parse_quarter_labels(labels)
+    is_quarter = quarter.notna()
+    parsed[is_quarter] = quarter_index(year[is_quarter], quarter[is_quarter]).to_timestamp(how="start")
+
+    years = pd.to_numeric(labels.str.extract(YEAR_PATTERN)["year"])
+    is_year = years.notna() & ~is_quarter
+    parsed[is_year] = pd.to_datetime(years[is_year].astype(int).astype(str), format="%Y")
+
+    rest = ~is_quarter & ~is_year
+    parsed[rest] = pd.to_datetime(labels[rest], errors="coerce", format="mixed")
+    return _expand(pd.DatetimeIndex(parsed), codes)
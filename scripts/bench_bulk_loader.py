@@ -0,0 +1,106 @@
+"""Benchmark the Arrow bulk loader against pd.DataFrame(list(find())).
+
+Needs a local mongod (pymongoarrow decodes raw BSON batches, which mongomock
+does not produce). Synthetic rents_quarterly documents are written to a
+scratch database and loaded both ways, each in a fresh process so the peak
+resident set size reflects that loader alone.
+
+    python scripts/bench_bulk_loader.py --uri mongodb://localhost:27017 --sizes 1000000 10000000
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import time
+
+import pandas as pd
+import pymongo
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+from pages.utils import bulk_loader  # noqa: E402
+
+COLLECTION = "rents_quarterly"
+COLUMNS = tuple(bulk_loader.COLLECTION_SCHEMAS[COLLECTION])
+AREAS = ["DUBAI MARINA", "BUSINESS BAY", "PALM JUMEIRAH", "JUMEIRAH VILLAGE CIRCLE", "AL FURJAN"]
+TYPES = ["Unit", "Villa", "Land", "Building"]
+
+
+def seed(collection, size, batch=50000):
+    """Fill the scratch collection with `size` synthetic rent documents"""
+    collection.drop()
+    rng = random.Random(42)
+    for start in range(0, size, batch):
+        docs = []
+        for _ in range(min(batch, size - start)):
+            docs.append({
+                "Quarter": f"{rng.randint(2015, 2024)}Q{rng.randint(1, 4)}",
+                "Contract Amount": rng.uniform(20000, 500000),
+                "Property Size (sq.m)": rng.uniform(30, 800),
+                "Area": rng.choice(AREAS),
+                "Property Type": rng.choice(TYPES),
+                "Property Sub Type": "Flat",
+                "Usage": "Residential",
+                "Latitude": 25.0 + rng.random() * 0.3,
+                "Longitude": 55.0 + rng.random() * 0.4,
+                "Nearest Metro": "Unknown",
+                "Nearest Mall": "Dubai Mall",
+                "Nearest Landmark": "Burj Khalifa"
+            })
+        collection.insert_many(docs, ordered=False)
+
+
+def load_dicts(collection):
+    """Current path: one dict per document, then a list, then a DataFrame"""
+    projection = {col: 1 for col in COLUMNS}
+    projection["_id"] = 0
+    return pd.DataFrame(list(collection.find({}, projection)), columns=list(COLUMNS))
+
+
+def load_arrow(collection):
+    """Bulk loader path: raw BSON batches decoded into Arrow columns"""
+    return bulk_loader.load_frame(collection, COLUMNS)
+
+
+def run(uri, loader, results):
+    """Child process body: load once, report rows, seconds and peak RSS in MiB"""
+    collection = pymongo.MongoClient(uri).bulk_loader_bench[COLLECTION]
+    start = time.perf_counter()
+    frame = loader(collection)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    results.put((len(frame), elapsed, peak))
+
+
+def measure(uri, loader):
+    """Run one loader in a fresh process and return its measurements"""
+    results = multiprocessing.Queue()
+    proc = multiprocessing.Process(target=run, args=(uri, loader, results))
+    proc.start()
+    measurement = results.get()
+    proc.join()
+    return measurement
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    args = parser.parse_args()
+
+    client = pymongo.MongoClient(args.uri)
+    collection = client.bulk_loader_bench[COLLECTION]
+    loaders = {"list(find())": load_dicts, "arrow": load_arrow}
+
+    for size in args.sizes:
+        seed(collection, size)
+        for name, loader in loaders.items():
+            rows, elapsed, peak = measure(args.uri, loader)
+            print(f"{size:>10,} docs  {name:<13} {elapsed:8.2f}s  peak RSS {peak:9.1f} MiB  ({rows:,} rows)")
+
+    client.drop_database("bulk_loader_bench")
+
+
+if __name__ == "__main__":
+    main()
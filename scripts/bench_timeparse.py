@@ -0,0 +1,61 @@
+"""Benchmark vectorized time parsing against the row-wise .apply parsers it replaced.
+
+    python scripts/bench_timeparse.py --sizes 1000000 5000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+from pages.utils.timeparse import parse_quarters, parse_dates, quarters_from_fields  # noqa: E402
+
+
+def legacy_parse_quarter(q_str):
+    """Previous per-row quarter parser from the Analysis page"""
+    year = int(q_str[:4])
+    quarter = int(q_str[-1])
+    return pd.Period(year=year, quarter=quarter, freq="Q")
+
+
+def legacy_gdp_periods(frame):
+    """Previous row-wise GDP timestamp construction"""
+    return frame.apply(lambda row: pd.Timestamp(f"{int(row['Time Period'])}-{int(row['Quarter'][-1])*3}-01"), axis=1)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 5_000_000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    for size in args.sizes:
+        years = rng.integers(2010, 2025, size)
+        quarters = rng.integers(1, 5, size)
+        quarter_labels = pd.Series([f"{y}Q{q}" for y, q in zip(years, quarters)])
+        month_labels = pd.Series([f"{y}-{m:02d}" for y, m in zip(years, rng.integers(1, 13, size))])
+        gdp = pd.DataFrame({"Time Period": years, "Quarter": [f"Q{q}" for q in quarters]})
+
+        cases = [
+            ("quarters  .apply", lambda: quarter_labels.apply(legacy_parse_quarter)),
+            ("quarters  vector", lambda: parse_quarters(quarter_labels)),
+            ("months    to_datetime", lambda: pd.to_datetime(month_labels, errors="coerce")),
+            ("months    vector", lambda: parse_dates(month_labels)),
+            ("gdp       .apply(axis=1)", lambda: legacy_gdp_periods(gdp)),
+            ("gdp       vector", lambda: quarters_from_fields(gdp["Time Period"], gdp["Quarter"]))
+        ]
+        for name, case in cases:
+            print(f"{size:>10,} rows  {name:<26} {timed(case):8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
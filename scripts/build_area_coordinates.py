@@ -0,0 +1,63 @@
+"""Build the Area -> (lat, lon) table the app ships for geocoding.
+
+Areas take the median of the coordinates already recorded on their rent
+contracts; areas without any are geocoded in one batch through the cached
+Geoapify client. The result is written to app/pages/utils/data/area_coordinates.csv,
+which is committed alongside the app; rebuild it when new areas appear in
+rents_quarterly. Pass --server-url to geocode against scripts/geoapify_stub.py
+instead of the real API.
+
+    python scripts/build_area_coordinates.py --uri "$MONGO_URI" --api-key "$GEOAPIFY_KEY"
+    git add app/pages/utils/data/area_coordinates.csv
+"""
+import argparse
+import os
+import sys
+
+import pandas as pd
+import pymongo
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+from pages.utils import geocoding  # noqa: E402
+
+COLLECTION = "rents_quarterly"
+
+
+def recorded_coordinates(collection):
+    """Median recorded (Latitude, Longitude) per Area, NaN for areas with none"""
+    docs = collection.find({}, {"_id": 0, "Area": 1, "Latitude": 1, "Longitude": 1})
+    frame = pd.DataFrame(list(docs), columns=["Area", "Latitude", "Longitude"]).dropna(subset=["Area"])
+    for col in ("Latitude", "Longitude"):
+        frame[col] = pd.to_numeric(frame[col], errors="coerce")
+    # The notebook geocoder wrote (0, 0) for places it could not resolve
+    frame.loc[(frame["Latitude"] == 0) & (frame["Longitude"] == 0), ["Latitude", "Longitude"]] = None
+    return frame.groupby("Area")[["Latitude", "Longitude"]].median()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--database", default="tourism_db")
+    parser.add_argument("--api-key", help="Geoapify key for areas without recorded coordinates")
+    parser.add_argument("--server-url", default=geocoding.GEOCODE_URL)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--output", default=geocoding.AREA_TABLE)
+    args = parser.parse_args()
+
+    table = recorded_coordinates(pymongo.MongoClient(args.uri)[args.database][COLLECTION])
+    missing = table.index[table["Latitude"].isna()]
+    if len(missing) and args.api_key:
+        geocoder = geocoding.Geocoder(args.api_key, args.server_url, max_workers=args.workers, area_table=None)
+        for area, place in geocoder.lookup_many(list(missing)).items():
+            if place is not None:
+                table.loc[area, ["Latitude", "Longitude"]] = place
+
+    unresolved = int(table["Latitude"].isna().sum())
+    table = table.dropna().round(6).sort_index()
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    table.to_csv(args.output, index_label="Area")
+    print(f"Wrote {len(table)} areas to {args.output} ({unresolved} unresolved)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Check the geocoder's caching layers against the local Geoapify stub.
+
+Starts scripts/geoapify_stub.py in-process on a free port, counts the
+requests that reach it, and checks address normalization, the Area table,
+the SQLite cache across Geocoder instances, not-found caching, and that failed
+or malformed responses are not cached. Exits non-zero on any failure.
+
+    python scripts/check_geocoding.py
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+from pages.utils import geocoding  # noqa: E402
+from geoapify_stub import make_handler, stub_point  # noqa: E402
+
+SUFFIX = ", Dubai, UAE"
+
+
+def start_stub(delay):
+    """Stub server on a free port whose handler counts requests; texts containing 'malformed' get a bad body"""
+    base = make_handler(argparse.Namespace(delay=delay, unknown_marker="nowhere", verbose=False))
+    requests_seen = []
+
+    class CountingHandler(base):
+        def do_GET(self):
+            requests_seen.append(self.path)
+            if "malformed" in self.path:
+                body = b"[1]"
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            super().do_GET()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}", requests_seen
+
+
+def checks(url, requests_seen, workdir):
+    cache = os.path.join(workdir, "geocode.sqlite")
+    table = os.path.join(workdir, "area_coordinates.csv")
+    with open(table, "w") as f:
+        f.write("Area,Latitude,Longitude\nPALM JUMEIRAH,25.112,55.139\n")
+
+    def geocoder(base_url=url, **kwargs):
+        return geocoding.Geocoder("stub", base_url, suffix=SUFFIX, cache_path=cache, area_table=table, **kwargs)
+
+    first = geocoder()
+    places = first.lookup_many(["Dubai Marina", "  dubai   marina, ", "DUBAI MARINA."])
+    yield "spelling variants share one upstream request", len(requests_seen) == 1
+    yield "variants resolve to the stub's point", set(places.values()) == {stub_point("dubai marina" + SUFFIX)}
+
+    yield "Area table answers without a request", first.lookup("Palm Jumeirah") == (25.112, 55.139) and len(requests_seen) == 1
+
+    first.lookup("Dubai Marina")
+    yield "repeat lookup stays in process", len(requests_seen) == 1
+
+    yield "unknown place resolves to None", first.lookup("Nowhere Street") is None and len(requests_seen) == 2
+
+    second = geocoder()
+    yield "new instance reads hits from SQLite", second.lookup("dubai marina") == places["Dubai Marina"] and len(requests_seen) == 2
+    yield "new instance reads not-found from SQLite", second.lookup("nowhere street") is None and len(requests_seen) == 2
+    yield "not-found entries expire after their TTL", geocoding.cached_places(["nowhere street"], not_found_ttl=0, path=cache) == {}
+
+    offline = geocoder(base_url="http://127.0.0.1:9", timeout=(0.5, 0.5))
+    yield "unreachable server resolves to None", offline.lookup("Business Bay") is None
+    yield "failed request is not cached", geocoding.cached_places(["business bay"], path=cache) == {}
+
+    yield "malformed body resolves to None", first.lookup("Malformed Place") is None
+    yield "malformed body is not cached", geocoding.cached_places(["malformed place"], path=cache) == {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--delay", type=float, default=0.05, help="stub seconds per response")
+    args = parser.parse_args()
+
+    server, url, requests_seen = start_stub(args.delay)
+    failed = 0
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            for name, ok in checks(url, requests_seen, workdir):
+                failed += not ok
+                print(f"{'ok  ' if ok else 'FAIL'} {name}")
+    finally:
+        server.shutdown()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""Check the vectorized numeric utilities against the pandas code they replaced.
+
+Covers the correlation engine (matrix, rolling and lead/lag), quarterly
+resampling, time parsing, the datasets' sorted period index and the market
+metrics engine on seeded synthetic data with gaps. Prints the largest
+deviation per check and exits non-zero if any exceeds its tolerance.
+
+    python scripts/check_numerics.py --rows 60 --seed 7
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+from pages.utils import market_metrics  # noqa: E402
+from pages.utils.correlation import lead_lag_correlations, pairwise_correlations, rolling_correlations  # noqa: E402
+from pages.utils.datasets import DATASETS, normalize  # noqa: E402
+from pages.utils.resample import to_quarterly  # noqa: E402
+from pages.utils.timeparse import parse_dates, parse_quarters, quarters_from_fields  # noqa: E402
+from bench_timeparse import legacy_gdp_periods, legacy_parse_quarter  # noqa: E402
+
+TOLERANCE = 1e-10
+
+
+def indicator_frame(rows, columns, rng):
+    """Correlated quarterly indicators with scattered missing values"""
+    base = rng.normal(size=(rows, 1)).cumsum(axis=0)
+    values = base + rng.normal(scale=2.0, size=(rows, columns)).cumsum(axis=0)
+    values[rng.random(values.shape) < 0.1] = np.nan
+    index = pd.date_range("2010-03-31", periods=rows, freq="QE")
+    return pd.DataFrame(values, index=index, columns=[f"ind_{i}" for i in range(columns)])
+
+
+def max_error(actual, expected):
+    """Largest absolute difference, treating matching NaNs as equal and mismatched ones as infinite"""
+    actual, expected = np.asarray(actual, dtype=float), np.asarray(expected, dtype=float)
+    if not np.array_equal(np.isnan(actual), np.isnan(expected)):
+        return np.inf
+    both = ~np.isnan(actual)
+    return float(np.abs(actual[both] - expected[both]).max()) if both.any() else 0.0
+
+
+def check_correlations(frame, window):
+    yield "pairwise_correlations vs DataFrame.corr", max_error(pairwise_correlations(frame), frame.corr()), TOLERANCE
+
+    rolling = rolling_correlations(frame, window)
+    errors = [
+        max_error(rolling[(left, right)], frame[left].rolling(window).corr(frame[right]))
+        for left, right in rolling.columns
+    ]
+    yield f"rolling_correlations({window}) vs rolling().corr", max(errors), TOLERANCE
+
+
+def check_lead_lag(frame, lags, windows, min_periods=4, label=""):
+    scan = lead_lag_correlations(frame, lags, windows, min_periods)
+    errors, period_mismatches = [], 0
+    for row in scan.itertuples(index=False):
+        leader = frame[row.leader].shift(row.lag)
+        follower = frame[row.follower]
+        if row.window is not None:
+            leader, follower = leader.iloc[-row.window:], follower.iloc[-row.window:]
+        periods = int((leader.notna() & follower.notna()).sum())
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # Constant columns have no correlation; pandas warns on its way to NaN
+            expected = leader.corr(follower, min_periods=min_periods)
+        errors.append(max_error([row.correlation], [expected]))
+        period_mismatches += periods != row.periods
+    yield f"lead_lag_correlations{label} ({len(scan)} combinations) vs shift().corr", max(errors), TOLERANCE
+    yield f"lead_lag_correlations{label} overlap counts", float(period_mismatches), 0
+
+
+def short_frame(rng, rows=10):
+    """Too few rows for the longest lags and windows, with a constant column"""
+    values = rng.normal(size=(rows, 3)).cumsum(axis=0)
+    values[rng.random(values.shape) < 0.1] = np.nan
+    frame = pd.DataFrame(values, columns=["a", "b", "c"])
+    frame["flat"] = 1.0
+    return frame
+
+
+def check_planted_lag(rng, rows=80, lag=3):
+    leader = pd.Series(rng.normal(size=rows + lag).cumsum())
+    frame = pd.DataFrame({
+        "leader": leader.iloc[lag:].to_numpy(),
+        "follower": leader.iloc[:rows].to_numpy() + rng.normal(scale=0.1, size=rows)
+    })
+    scan = lead_lag_correlations(frame, range(1, 9))
+    pair = scan[(scan["leader"] == "leader") & (scan["follower"] == "follower")]
+    best = int(pair.loc[pair["correlation"].idxmax(), "lag"])
+    yield "lead_lag_correlations recovers a planted lag", float(abs(best - lag)), 0
+
+
+def check_resample(rng):
+    months = pd.date_range("2015-01-01", "2021-06-01", freq="MS")
+    monthly = pd.Series(rng.normal(100, 5, len(months)), index=months).drop(months[[5, 6, 7, 30]])
+    expected = monthly.resample("QE").mean()
+    yield "to_quarterly monthly mean vs resample('QE').mean", max_error(to_quarterly(monthly, source="M"), expected), TOLERANCE
+
+    starts = pd.period_range("2015Q1", "2021Q2", freq="Q").start_time
+    quarterly = pd.Series(rng.normal(3, 1, len(starts)), index=starts).repeat(3)
+    expected = quarterly.resample("QE").sum(min_count=1)
+    yield "to_quarterly quarterly sum vs resample('QE').sum", max_error(to_quarterly(quarterly, agg="sum"), expected), TOLERANCE
+
+    years = pd.date_range("2012-01-01", "2020-01-01", freq="YS")
+    annual = pd.Series(rng.normal(3e6, 1e5, len(years)), index=years)
+    full = pd.date_range(years[0], "2020-12-31", freq="QE")
+    expected = annual.resample("QE").first().reindex(full).ffill()
+    result = to_quarterly(annual, source="Y", agg="first", fill="ffill")
+    index_ok = result.index.equals(full)
+    yield "to_quarterly annual ffill vs resample + reindex + ffill", max_error(result, expected) if index_ok else np.inf, TOLERANCE
+
+    sparse = annual.drop(years[[2, 3, 6]])
+    expected = sparse.resample("QE").first().reindex(full).interpolate(method="linear", limit_area="inside").ffill()
+    result = to_quarterly(sparse, source="Y", agg="first", fill="interpolate")
+    index_ok = result.index.equals(full)
+    yield "to_quarterly annual interpolate vs resample + interpolate", max_error(result, expected) if index_ok else np.inf, TOLERANCE
+
+    expected = monthly.resample("QS").mean()
+    result = to_quarterly(monthly, source="M", anchor="start")
+    index_ok = result.index.equals(expected.index)
+    yield "to_quarterly anchor='start' vs resample('QS').mean", max_error(result, expected) if index_ok else np.inf, TOLERANCE
+
+
+def check_timeparse(rng, size=20000):
+    years = rng.integers(2010, 2025, size)
+    quarters = rng.integers(1, 5, size)
+    labels = pd.Series([f"{y}Q{q}" for y, q in zip(years, quarters)])
+    expected = pd.PeriodIndex(labels.apply(legacy_parse_quarter), freq="Q")
+    yield "parse_quarters vs per-row parser", float((parse_quarters(labels) != expected).sum()), 0
+
+    # Other spellings parse to the canonical label's quarter; junk and missing labels give NaT
+    forms = ("{y}-Q{q}", "Q{q}-{y}", " q{q} {y} ", "{y}q{q}", "Q{q}-{y}x", None)
+    spellings = pd.Series([
+        None if form is None else form.format(y=y, q=q)
+        for y, q, form in zip(years, quarters, rng.choice(np.array(forms, dtype=object), size))
+    ])
+    junk = spellings.isna() | spellings.str.endswith("x", na=False)
+    expected = pd.PeriodIndex(labels.apply(legacy_parse_quarter), freq="Q").where(~junk.to_numpy())
+    parsed = parse_quarters(spellings)
+    mismatches = (parsed.isna() != expected.isna()).sum() + (parsed[~junk.to_numpy()] != expected[~junk.to_numpy()]).sum()
+    yield "parse_quarters alternate spellings and junk", float(mismatches), 0
+
+    months = pd.Series([f"{y}-{m:02d}" for y, m in zip(years, rng.integers(1, 13, size))])
+    expected = pd.DatetimeIndex(pd.to_datetime(months, errors="coerce"))
+    yield "parse_dates vs pd.to_datetime", float((parse_dates(months) != expected).sum()), 0
+
+    mixed = pd.Series([f"{y}Q{q}" if i % 3 == 0 else str(y) if i % 3 == 1 else "n/a" for i, (y, q) in enumerate(zip(years, quarters))])
+    expected = pd.DatetimeIndex([
+        pd.Period(year=y, quarter=q, freq="Q").start_time if i % 3 == 0 else pd.Timestamp(year=y, month=1, day=1) if i % 3 == 1 else pd.NaT
+        for i, (y, q) in enumerate(zip(years, quarters))
+    ])
+    parsed = parse_dates(mixed)
+    yield "parse_dates quarters and years to period starts", float(((parsed != expected) & ~(parsed.isna() & expected.isna())).sum()), 0
+
+    gdp = pd.DataFrame({"Time Period": years, "Quarter": [f"Q{q}" for q in quarters]})
+    expected = pd.PeriodIndex(legacy_gdp_periods(gdp), freq="Q")
+    yield "quarters_from_fields vs row-wise apply", float((quarters_from_fields(gdp["Time Period"], gdp["Quarter"]) != expected).sum()), 0
+
+
+def check_datasets(rng, size=20000):
+    labels = pd.Series([f"{y}Q{q}" for y, q in zip(rng.integers(2010, 2025, size), rng.integers(1, 5, size))])
+    labels[rng.random(size) < 0.02] = "unknown"
+    frame = pd.DataFrame({"Quarter": labels, "Amount": rng.lognormal(11, 0.8, size), "Transaction Size (sq.m)": rng.uniform(30, 800, size)})
+    normalized = normalize(frame, DATASETS["transactions"])
+
+    valid = labels != "unknown"
+    starts = pd.PeriodIndex(labels[valid].apply(legacy_parse_quarter), freq="Q").start_time
+    expected = pd.Series(frame.loc[valid, "Amount"].to_numpy(), index=starts).sort_index(kind="stable")
+    index_ok = normalized.index.is_monotonic_increasing and normalized.index.equals(expected.index)
+    yield "normalize period index vs per-row parser, sorted", max_error(normalized["Amount"], expected) if index_ok else np.inf, 0
+
+    start, end = pd.Timestamp("2014-04-01"), pd.Timestamp("2019-09-30")
+    window = normalized.loc[start:end, "Amount"]
+    yield "period index range slice vs row mask", max_error(window, expected[(expected.index >= start) & (expected.index <= end)]), 0
+
+
+def bracket_error(estimate, values, q):
+    """Relative distance of a histogram quantile outside the sample values bracketing quantile q.
+
+    pandas interpolates between the order statistics at floor and ceil of
+    (n - 1) * q; the histogram estimate lies in the bin of one of them.
+    """
+    values = np.sort(np.asarray(values, dtype=float))
+    position = (len(values) - 1) * q
+    low, high = values[int(np.floor(position))], values[int(np.ceil(position))]
+    return max(low / estimate - 1, estimate / high - 1, 0.0)
+
+
+def check_market_metrics(rng, size=100000):
+    quarters = pd.period_range("2014Q1", "2024Q4", freq="Q")
+    index = pd.DatetimeIndex(quarters[rng.integers(0, len(quarters), size)].start_time).sort_values()
+    frame = pd.DataFrame({
+        "Amount": rng.lognormal(11, 0.8, size),
+        "Area": rng.choice([f"Area {i}" for i in range(40)], size)
+    }, index=index)
+    frame.iloc[::50, 0] = np.nan
+    summary = market_metrics.build_summary(frame, "Amount", "Area")
+    values = frame["Amount"].dropna()
+    # One log bin spans this ratio, so histogram quantiles are within it of the sample values they estimate
+    bin_ratio = (values.max() / values.min()) ** (1 / market_metrics.BINS) - 1
+    group_ratio = (values.max() / values.min()) ** (1 / market_metrics.GROUP_BINS) - 1
+
+    count_errors, mean_errors, quantile_errors, median_errors, yoy_errors, edge_errors = [], [], [], [], [], []
+    for start, end in [("2014-01-01", "2024-12-31"), ("2016-05-01", "2019-08-31"), ("2020-01-01", "2020-03-31")]:
+        metrics = market_metrics.range_metrics(summary, start, end)
+        rows = frame[(frame.index >= start) & (frame.index <= end)]
+        count_errors.append(abs(metrics["rows"] - len(rows)))
+        mean_errors.append(abs(metrics["mean"] / rows["Amount"].mean() - 1))
+        amounts = rows["Amount"].dropna()
+        quantile_errors += [bracket_error(metrics["quantiles"][q], amounts, q) for q in market_metrics.QUANTILES]
+        median_errors += [
+            bracket_error(median, rows.loc[rows["Area"] == area, "Amount"].dropna(), 0.5)
+            for area, median in metrics["group_medians"].items()
+        ]
+
+        # Latest four quarters against the four before them, from the rows
+        quarter = pd.PeriodIndex(rows.index, freq="Q")
+        last = metrics["last_quarter"]
+        recent, prior = rows[quarter > last - 4], rows[(quarter > last - 8) & (quarter <= last - 4)]
+        covered = len(pd.period_range(metrics["first_quarter"], last, freq="Q")) >= 8
+        expected = [
+            (recent["Amount"].mean() / prior["Amount"].mean() - 1) * 100 if covered else np.nan,
+            (len(recent) / len(prior) - 1) * 100 if covered else np.nan
+        ]
+        yoy_errors.append(max_error([metrics["yoy_mean"], metrics["yoy_rows"]], expected))
+        edge_errors.append(max(
+            abs(metrics["first_rows"] - (quarter == metrics["first_quarter"]).sum()),
+            abs(metrics["latest_rows"] - (quarter == last).sum())
+        ))
+
+    yield "range_metrics row counts", float(max(count_errors)), 0
+    yield "range_metrics means (relative)", max(mean_errors), TOLERANCE
+    yield "range_metrics quantiles (relative, one bin of samples)", max(quantile_errors), bin_ratio
+    yield "range_metrics area medians (relative, one bin of samples)", max(median_errors), group_ratio
+    yield "range_metrics year-over-year mean and row growth (%)", max(yoy_errors), 1e-8
+    yield "range_metrics first and latest quarter row counts", float(max(edge_errors)), 0
+
+    years = pd.date_range("2016-01-01", "2020-01-01", freq="YS")
+    annual = pd.DataFrame({"Value": np.arange(1.0, 6.0)}, index=years)
+    metrics = market_metrics.range_metrics(market_metrics.build_summary(annual, "Value"), "2016-04-01", "2020-09-30")
+    observed = (str(metrics["first_observed"]), metrics["first_mean"], str(metrics["latest_observed"]), metrics["latest_mean"])
+    yield "range_metrics first/last observed on an annual series", float(observed != ("2017Q1", 2.0, "2020Q1", 5.0)), 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=60, help="quarters in the synthetic indicator frame")
+    parser.add_argument("--columns", type=int, default=4)
+    parser.add_argument("--window", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    frame = indicator_frame(args.rows, args.columns, rng)
+    checks = [
+        *check_correlations(frame, args.window),
+        *check_lead_lag(frame, range(1, 9), (None, 20, 12, 8)),
+        *check_lead_lag(short_frame(rng), range(1, 13), (None, 20, 6), label=" short"),
+        *check_planted_lag(rng),
+        *check_resample(rng),
+        *check_timeparse(rng),
+        *check_datasets(rng),
+        *check_market_metrics(rng)
+    ]
+
+    failed = 0
+    for name, error, tolerance in checks:
+        ok = error <= tolerance
+        failed += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {name:<58} max error {error:.3g} (tolerance {tolerance:.3g})")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Local stand-in for the Geoapify geocoding API that returns deterministic coordinates.
+
+Every search text maps to a stable point inside Dubai derived from its hash,
+so repeated runs geocode identically without a network or an API key. Texts
+containing --unknown-marker return no features, to exercise not-found
+handling. Point the app at it with
+
+    [geoapify]
+    key = "stub"
+    server_url = "http://localhost:8766"
+
+in .streamlit/secrets.toml, then run
+
+    python scripts/geoapify_stub.py --port 8766 --delay 0.2
+"""
+import argparse
+import hashlib
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Rough bounding box of the Dubai urban area: (south, west, north, east)
+DUBAI_BOUNDS = (24.85, 54.95, 25.35, 55.55)
+
+
+def stub_point(text):
+    """Stable (lat, lon) for a search text"""
+    digest = hashlib.sha256(text.casefold().encode()).digest()
+    south, west, north, east = DUBAI_BOUNDS
+    lat = south + (north - south) * int.from_bytes(digest[:4], "big") / 2 ** 32
+    lon = west + (east - west) * int.from_bytes(digest[4:8], "big") / 2 ** 32
+    return round(lat, 6), round(lon, 6)
+
+
+def feature_collection(text, found):
+    """GeoJSON search response with at most one feature"""
+    features = []
+    if found:
+        lat, lon = stub_point(text)
+        features.append({
+            "type": "Feature",
+            "properties": {"formatted": text, "lat": lat, "lon": lon, "result_type": "suburb"},
+            "geometry": {"type": "Point", "coordinates": [lon, lat]}
+        })
+    return {"type": "FeatureCollection", "features": features, "query": {"text": text}}
+
+
+def make_handler(args):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path.rstrip("/") != "/v1/geocode/search":
+                self.send_error(404)
+                return
+            query = parse_qs(url.query)
+            text = query.get("text", [""])[0]
+            if not query.get("apiKey") or not text:
+                self.send_error(401 if not query.get("apiKey") else 400)
+                return
+
+            time.sleep(args.delay)
+            body = json.dumps(feature_collection(text, args.unknown_marker.casefold() not in text.casefold())).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *log_args):
+            if args.verbose:
+                super().log_message(format, *log_args)
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--delay", type=float, default=0.2, help="seconds before each response")
+    parser.add_argument("--unknown-marker", default="nowhere", help="texts containing this return no match")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args))
+    print(f"Geoapify stub listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Local stand-in for the Mistral chat completions API that returns canned analyses.
+
+Streams the canned text as server-sent events when the request asks for
+stream=true, with a configurable delay before the first token and between
+chunks, so streaming can be exercised offline. Point the app at it with
+
+    [mistral]
+    key = "stub"
+    server_url = "http://localhost:8765"
+
+in .streamlit/secrets.toml, then run
+
+    python scripts/mistral_stub.py --port 8765 --first-token-delay 0.5 --chunk-delay 0.05
+"""
+import argparse
+import json
+import re
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED_ANALYSIS = """## Market Analysis 📈
+Dubai rents kept rising over the selected period, with contract volumes recovering after each seasonal dip. 🏙️
+
+## Opportunities 💡
+Mid-market apartments near new metro stations show the strongest rent growth relative to transaction prices.
+
+## Risks ⚠️
+Supply Pipeline: a large wave of handovers could soften rents in outer communities.
+
+Interest Rates: higher financing costs may slow off-plan demand.
+
+Regulatory Changes: rent cap adjustments can limit short-term yield growth.
+"""
+
+
+def chunks(text, size):
+    """Word-aligned pieces of roughly `size` characters"""
+    return re.findall(r".{1,%d}(?:\s+|$)" % size, text, flags=re.S)
+
+
+def completion(model, text):
+    """Non-streaming chat completion response body"""
+    return {
+        "id": uuid.uuid4().hex,
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "usage": {"prompt_tokens": 0, "completion_tokens": len(text.split()), "total_tokens": len(text.split())},
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}]
+    }
+
+
+def completion_chunk(completion_id, model, content, finish_reason=None):
+    """One streamed chunk event body"""
+    return {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": {"role": "assistant", "content": content}, "finish_reason": finish_reason}]
+    }
+
+
+def make_handler(args):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            if self.path.rstrip("/") != "/v1/chat/completions":
+                self.send_error(404)
+                return
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            model = request.get("model", "stub")
+
+            if not request.get("stream"):
+                time.sleep(args.first_token_delay + args.chunk_delay * len(chunks(CANNED_ANALYSIS, args.chunk_size)))
+                body = json.dumps(completion(model, CANNED_ANALYSIS)).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            completion_id = uuid.uuid4().hex
+            time.sleep(args.first_token_delay)
+            for piece in chunks(CANNED_ANALYSIS, args.chunk_size):
+                self.send_event(completion_chunk(completion_id, model, piece))
+                time.sleep(args.chunk_delay)
+            self.send_event(completion_chunk(completion_id, model, "", finish_reason="stop"))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+            self.close_connection = True
+
+        def send_event(self, payload):
+            self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode())
+            self.wfile.flush()
+
+        def log_message(self, format, *log_args):
+            if args.verbose:
+                super().log_message(format, *log_args)
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--first-token-delay", type=float, default=0.5, help="seconds before the first chunk")
+    parser.add_argument("--chunk-delay", type=float, default=0.05, help="seconds between chunks")
+    parser.add_argument("--chunk-size", type=int, default=24, help="approximate characters per chunk")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args))
+    print(f"Mistral stub listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()